@@ -0,0 +1,68 @@
+# Module for array variables, only imported once a program uses them so NumPy stays an optional dependency
+# Arrays are READ from files: .npy files and raw float64 binaries are memory-mapped, .txt files hold whitespace separated numbers
+# data[] is the length of the array data. FOR only counts iterations and never sets its variable, so walk an array with a counter:
+#     i <- 0
+#     WHILE i < data[] DO {
+#         s <- s + data[i]
+#         i <- i + 1
+#     }
+
+def loadArray(fileName): #Memory maps are copy-on-write, element assignments never reach the file and untouched pages are never loaded
+    try: import numpy
+    except ImportError: raise RuntimeError("Array variables need NumPy, install it with \"pip install numpy\".") from None
+    try:
+        if fileName.endswith(".npy"): return numpy.load(fileName, mmap_mode = "c")
+        if fileName.endswith(".txt"): return numpy.fromfile(fileName, sep = " ")
+        return numpy.memmap(fileName, dtype = numpy.float64, mode = "c")
+    except (OSError, ValueError) as error: raise RuntimeError(f"Couldn't load array from \"{fileName}\": {error}") from None
+
+PY_READ_ARRAY = """import numpy
+
+def readArray(name):
+\tfileName = input(f'Program requested file for array "{name}": ')
+\tif fileName.endswith('.npy'): return numpy.load(fileName, mmap_mode = 'c')
+\tif fileName.endswith('.txt'): return numpy.fromfile(fileName, sep = ' ')
+\treturn numpy.memmap(fileName, dtype = numpy.float64, mode = 'c')
+
+def arrayIndex(array, index, name):
+\tif index != int(index) or not 0 <= index < len(array): raise RuntimeError(f'Invalid index {index} for array "{name}" of length {len(array)}.')
+\treturn int(index)
+
+"""
+
+C_READ_ARRAY = """#include<string.h>
+
+double *readArray(const char *name, long *length) {
+\tchar fileName[4096];
+\tprintf("Program requested file for array \\"%s\\": ", name);
+\tif(scanf("%4095s", fileName) != 1) exit(1);
+\tlong nameLength = strlen(fileName);
+\tFILE *fd = fopen(fileName, "rb");
+\tif(fd == NULL || (nameLength > 4 && strcmp(fileName + nameLength - 4, ".npy") == 0)) {
+\t\tfprintf(stderr, "Couldn't load array from \\"%s\\".\\n", fileName);
+\t\texit(1);
+\t}
+\tdouble *values;
+\tif(nameLength > 4 && strcmp(fileName + nameLength - 4, ".txt") == 0) {
+\t\tlong capacity = 1024;
+\t\tdouble value;
+\t\tvalues = (double *) malloc(capacity * sizeof(double));
+\t\t*length = 0;
+\t\twhile(fscanf(fd, "%lf", &value) == 1) {
+\t\t\tif(*length == capacity) values = (double *) realloc(values, (capacity *= 2) * sizeof(double));
+\t\t\tvalues[(*length)++] = value;
+\t\t}
+\t} else {
+\t\tfseek(fd, 0, SEEK_END);
+\t\t*length = ftell(fd) / sizeof(double);
+\t\tfseek(fd, 0, SEEK_SET);
+\t\tvalues = (double *) malloc((*length + 1) * sizeof(double));
+\t\t*length = fread(values, sizeof(double), *length, fd);
+\t}
+\tfclose(fd);
+\treturn values;
+}
+
+"""
+
+CPP_READ_ARRAY = "#include<cstdio>\n" + C_READ_ARRAY.replace("#include<string.h>", "#include<cstring>")
@@ -0,0 +1,200 @@
+# Module for writing parsed programs to files and reading them back, only imported by AST dumps and binary AST loads
+# The text format is the debug dump of formatNode. The binary one writes every node as a (shape ID, values...) tuple, after a table of the (keys, type) shapes of the nodes,
+# in compressed marshal'd chunks of a preorder walk: items are whole subtrees or, for the ones too deep to marshal, {"(" : shape ID} or {"[" : length} markers followed by their values
+import marshal
+import struct
+import zlib
+from parser import ModuleParser, printNode
+
+MAGIC = b"\x00PCAST\x03" #Starts every binary AST file, the last byte is the format version. Sources can't start with a NUL byte, so none is mistaken for a dump
+OLD_MAGICS = (b"PCAST\x01", b"PCAST\x02") #Headers of the formats before it, only recognized to be refused
+FORMATS = ("text", "binary")
+TEXT_BUFFER = 1 << 12 #Pieces of the text dump joined by every write
+BINARY_CHUNK = 1 << 14 #Preorder items marshal'd together, neither writer nor loader recurse so ASTs of any depth fit
+CHUNK_SIZE = struct.Struct("<I")
+MARSHAL_DEPTH = 1000 #Nesting of the deepest subtree written whole, marshal refuses objects nested deeper than 2000
+DONE = object() #Returned by the container iterators of the writers once they run out
+BUILD = object() #Pushed by encode below the values of a container, it is popped once they are all encoded
+
+def dump(node, fd, format = "text"):
+    if format == "text": dumpText(node, fd)
+    elif format == "binary": dumpBinary(node, fd)
+    else: raise Exception(f"Unknown AST format \"{format}\", choose among {', '.join(FORMATS)}.")
+
+def dumpText(node, fd): #Writes formatNode(node) to the text file fd, walking the AST with an explicit stack so the time is linear in the size of the dump
+    pieces = []
+    indents = [""]
+    stack = [] #(items left, depth, closing bracket) of the open containers
+    while True:
+        if type(node) in (list, dict):
+            pieces.append("[" if type(node) is list else "{")
+            stack.append((iter(node if type(node) is list else node.items()), stack[-1][1] + 1 if stack else 0, "]" if type(node) is list else "}"))
+        else: pieces.append(str(node))
+
+        node = None
+        while stack:
+            items, depth, ending = stack[-1]
+            item = next(items, DONE)
+            if item is DONE:
+                stack.pop()
+                pieces.append(f"\n{indents[depth]}{ending}")
+                continue
+            if depth + 1 == len(indents): indents.append(indents[-1] + "⋮ ")
+            pieces.append(f"\n{indents[depth + 1]}")
+            if type(item) is tuple:
+                if item[0] != "type": pieces.append(f"{item[0]} : ")
+                item = item[1]
+            node = item
+            break
+
+        if len(pieces) >= TEXT_BUFFER or node is None:
+            fd.write("".join(pieces))
+            pieces = []
+        if node is None: return
+
+def dumpBinary(node, fd): #Writes the binary format to the binary file fd, ASTs shallow enough for marshal are written whole so only deep ones pay for the preorder walk
+    shapes = {}
+    tree = encode(node, shapes)
+    fd.write(MAGIC)
+    writeChunk(list(shapes), fd)
+    try:
+        writeChunk([tree], fd)
+        return
+    except ValueError: pass #Too deeply nested to marshal at once
+
+    heights = subtreeHeights(tree)
+    chunk = []
+    stack = [iter((tree,))]
+    while stack:
+        item = next(stack[-1], DONE)
+        if item is DONE:
+            stack.pop()
+            continue
+        if type(item) in (tuple, list) and heights[id(item)] < MARSHAL_DEPTH: chunk.append(item)
+        elif type(item) is tuple:
+            chunk.append({"(" : item[0]})
+            stack.append(iter(item[1:]))
+        elif type(item) is list:
+            chunk.append({"[" : len(item)})
+            stack.append(iter(item))
+        else: chunk.append(item)
+        if len(chunk) >= BINARY_CHUNK:
+            writeChunk(chunk, fd)
+            chunk = []
+    if chunk: writeChunk(chunk, fd)
+
+def encode(node, shapes): #Returns the AST with its nodes turned into (shape ID, values...) tuples, shapes maps the (keys, type) of every node to its ID
+    values = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if item is BUILD: #All the values of the container below were encoded, they are the last ones
+            shapeID = stack.pop()
+            start = len(values) - stack.pop()
+            part = values[start:]
+            del values[start:]
+            values.append(part if shapeID is None else (shapeID, *part))
+        elif type(item) is dict:
+            keys = tuple(item)
+            if keys[0] != "type": raise Exception("Binary ASTs can only hold nodes starting with their type.")
+            stack += (len(keys) - 1, shapes.setdefault((keys, item["type"]), len(shapes)), BUILD)
+            children = list(item.values())
+            stack += reversed(children[1:])
+        elif type(item) is list:
+            stack += (len(item), None, BUILD)
+            stack += reversed(item)
+        elif type(item) is tuple: raise Exception("Binary ASTs can't hold tuples, they encode nodes.")
+        else: values.append(item)
+    return values[0]
+
+def writeChunk(chunk, fd): #Chunks are prefixed by their size, so the loader can unmarshal them straight from the bytes
+    data = zlib.compress(marshal.dumps(chunk))
+    fd.write(CHUNK_SIZE.pack(len(data)))
+    fd.write(data)
+
+def subtreeHeights(node): #id -> nesting of every container in the encoded AST, computed bottom-up without recursion
+    heights = {}
+    stack = [(node, False)]
+    while stack:
+        node, visited = stack.pop()
+        children = [child for child in node if type(child) in (tuple, list)]
+        if visited: heights[id(node)] = 1 + max((heights[id(child)] for child in children), default = 0)
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+    return heights
+
+def decode(item, shapes): #Turns the (shape ID, values...) tuples of an encoded subtree back into nodes, top-down without recursion
+    if type(item) not in (tuple, list): return item
+    root = [item]
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        for key, value in (container.items() if type(container) is dict else enumerate(container)):
+            if type(value) is tuple:
+                fields, typeName = shapes[value[0]]
+                value = dict(zip(fields, value))
+                value["type"] = typeName
+                container[key] = value
+                stack.append(value)
+            elif type(value) is list: stack.append(value)
+    return root[0]
+
+def isBinary(data): return data[:len(MAGIC) - 1] == MAGIC[:-1] or data.startswith(OLD_MAGICS) #Dumps of every format version, loadBinary refuses the older ones
+
+def formatVersion(data):
+    if data.startswith(OLD_MAGICS): return data[len(OLD_MAGICS[0]) - 1]
+    return data[len(MAGIC) - 1]
+
+def loadBinary(data): #Rebuilds the AST from the bytes of a binary dump. Chunks are read with marshal, which trusts its input: never load files from untrusted sources
+    if not isBinary(data): raise Exception("Not a binary AST: missing header, the file was not written by dumpBinary.")
+    if data[:len(MAGIC)] != MAGIC: raise Exception(f"Binary AST of format version {formatVersion(data)}, this version only loads version {MAGIC[-1]}: dump the program again.")
+    data = memoryview(data)
+    offset = len(MAGIC)
+    shapes = None #[(("type", keys...), type)] by shape ID, read from the first chunk
+    root = []
+    frames = [[root, 1, None]] #[container, values left, keys of the node]
+    try:
+        while offset < len(data):
+            size, = CHUNK_SIZE.unpack_from(data, offset)
+            offset += CHUNK_SIZE.size + size
+            if offset > len(data): break
+            items = marshal.loads(zlib.decompress(data[offset - size:offset]))
+            if shapes is None:
+                shapes = items
+                continue
+            for item in items:
+                frame = frames[-1]
+                container = frame[0]
+                left, fields = 0, None
+                if type(item) is not dict: value = decode(item, shapes)
+                elif "(" in item:
+                    fields, typeName = shapes[item["("]]
+                    value = {"type" : typeName}
+                    left = len(fields) - 1
+                else:
+                    value = []
+                    left = item["["]
+                if type(container) is dict: container[frame[2][len(frame[2]) - frame[1]]] = value
+                else: container.append(value)
+                frame[1] -= 1
+                if left: frames.append([value, left, fields])
+                while frames[-1][1] == 0 and len(frames) > 1: frames.pop()
+    except (EOFError, ValueError, TypeError, IndexError, KeyError, struct.error, zlib.error): raise Exception("Corrupted binary AST.") from None
+    if len(frames) != 1 or frames[0][1]: raise Exception("Truncated binary AST.")
+    return root[0]
+
+class ASTReader(ModuleParser): #Parser interface over a binary dump, the program built and run from it is never parsed again
+    def __init__(self, data, moduleName = "<main>"):
+        super().__init__(moduleName, ())
+        self.data = data
+        self.nextToken = None
+
+    def parse(self, doPrint = False):
+        program = loadBinary(self.data)
+        if doPrint: printNode(program)
+        return program
+
+    def sourceHash(self):
+        import hashlib
+        return hashlib.sha256(self.data).hexdigest()
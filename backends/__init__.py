@@ -0,0 +1,28 @@
+# Transpile backends, one module per language imported the first time a program is transpiled to it
+# Every backend module has a transpile(node) function and a transpileProgram(root) one writing the whole program with its boilerplate
+LANGUAGES = ("js", "py", "c", "cpp", "gl")
+
+declared = {} #Variables already declared by the program being transpiled, "array" for the ones holding arrays and "defined" for the others
+tabID = 0
+
+def load(lang):
+    if lang not in LANGUAGES: raise Exception("Language \"%s\" unavailable, your options are: %s" % (lang, ", ".join(LANGUAGES)))
+    return __import__(f"backends.{lang}", fromlist = ["transpileProgram"])
+
+def reset():
+    global declared, tabID
+    declared = {}
+    tabID = 0
+
+def wholeArray(node): #Name of the first whole array the node works on, None if it only works on numbers. Only known while transpiling, as READ and array assignments mark their targets as declared arrays
+    if type(node).__name__ == "Operation": return wholeArray(node.op1) or wholeArray(node.op2)
+    if node.isVar and node.index is None and not node.isLength and declared.get(node.value) == "array": return node.value
+    return None
+
+def rejectArrays(lang):
+    raise Exception(f"Array variables can't be transpiled to {lang}.")
+
+def arrayHelpers(helpersName): #Programs READing arrays get the function that loads them
+    if "array" not in declared.values(): return ""
+    import arrays
+    return getattr(arrays, helpersName)
@@ -0,0 +1,140 @@
+# C backend, arrays are double pointers with a <name>_len length
+import backends
+from backends import wholeArray
+
+def transpile(node, *args): return TRANSPILERS[type(node).__name__](node, *args)
+
+def transpileProgram(root): return Block(root, isStart = True)
+
+def boilerplate(helpers = ""): return [f"#include<stdio.h>\n#include<stdlib.h>\n\n{helpers}int main() {{\n", "\n}"]
+
+def Block(self, isStart = False):
+    backends.tabID += 1
+    indent = backends.tabID * "\t"
+    text = indent + (";\n%s" % indent).join([transpile(line) for line in self.lines])
+    if len(text.lstrip()) and text[-1] != "}": text += ";"
+    backends.tabID -= 1
+    if isStart: wrapper = boilerplate(backends.arrayHelpers("C_READ_ARRAY"))
+    return f"{wrapper[0]}{text}{wrapper[1]}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
+
+def assignArray(self, lang, transpile): #Results go to a new buffer as the target may be one of the operands, also used by the cpp backend with its own transpile
+    indent = backends.tabID * "\t"
+    declared = self.target in backends.declared
+    if declared and backends.declared[self.target] != "array": raise Exception(f"Variable \"{self.target}\" can't hold both numbers and arrays in {lang}.")
+    backends.declared[self.target] = "array"
+    text = "" if declared else f"double *{self.target};\n{indent}long {self.target}_len;\n{indent}"
+    if type(self.value).__name__ == "Identifier": return f"{text}{self.target} = {self.value.value};\n{indent}{self.target}_len = {self.value.value}_len"
+
+    return f"{text}{{ long _length = {wholeArray(self.value)}_len; double *_values = (double *) malloc(_length * sizeof(double)); for(long _i = 0; _i < _length; _i++) _values[_i] = {transpile(self.value, True)}; {self.target} = _values; {self.target}_len = _length; }}"
+
+def assignItem(self, transpile):
+    return f"{self.target}[(long)({transpile(self.index)})] = {transpile(self.value)}"
+
+def readArray(name, lang):
+    indent = backends.tabID * "\t"
+    if name not in backends.declared:
+        backends.declared[name] = "array"
+        return f"double *{name};\n{indent}long {name}_len;\n{indent}{name} = readArray(\"{name}\", &{name}_len)"
+    if backends.declared[name] != "array": raise Exception(f"Variable \"{name}\" can't hold both numbers and arrays in {lang}.")
+    return f"{name} = readArray(\"{name}\", &{name}_len)"
+
+def Assignment(self):
+    if self.index is not None: return assignItem(self, transpile)
+    if wholeArray(self.value): return assignArray(self, "c", transpile)
+    if backends.declared.get(self.target) == "array": raise Exception(f"Variable \"{self.target}\" can't hold both numbers and arrays in c.")
+    target = ""
+    if self.target not in backends.declared:
+        target = "float "
+        backends.declared[self.target] = "defined"
+    value = transpile(self.value)
+    target += f"{self.target} = "
+    if type(value) is tuple:
+        target += value[0]
+        return target, value
+
+    return f"{target}{value}"
+
+def WriteInstruction(self):
+    array = wholeArray(self.value)
+    if array: return f"for(long _i = 0; _i < {array}_len; _i++) printf(\"%f \", {transpile(self.value, True)});\n" + "\t" * backends.tabID + "printf(\"\\n\")"
+    value = transpile(self.value)
+    if type(self.value).__name__ != "Operation" and self.value.isMsg: return f"printf(\"%s\\n\", {value})"
+    return f"printf(\"%f\\n\", (double)({value}))" #Array lengths are longs, printing them as %f would be undefined
+
+def ReadInstruction(self):
+    values = []
+    indent = backends.tabID * "\t"
+    for name in self.value:
+        if name in self.arrays:
+            values.append(readArray(name, "c"))
+            continue
+        values.append("")
+        if name not in backends.declared:
+            values[-1] += "float "
+            backends.declared[name] = "defined"
+        values[-1] += f"{name};\n{indent}scanf(\"%f\", &{name})"
+    return (";\n" + indent).join(values)
+
+def ForInstruction(self):
+    iterator = transpile(self.assignment)
+    if type(iterator) is tuple:
+        fromValue, toValue = iterator[1]
+        iterator = iterator[0]
+    else:
+        fromValue = 0
+        toValue = iterator[iterator.find("=") + 2:]
+
+    return f"{iterator};\n" + "\t" * backends.tabID + f"for(int _ = {fromValue}; _ < {toValue}; _++) {transpile(self.block)}"
+
+def conditional(self):
+    return "(%s) %s" % (transpile(self.condition), transpile(self.block))
+
+def IfInstruction(self):
+    text = f"if{conditional(self)}"
+    if hasattr(self, "elseBlock"):
+        text += f" else {transpile(self.elseBlock)}"
+    return text
+
+def WhileInstruction(self):
+    return f"while {conditional(self)}"
+
+def RepeatInstruction(self):
+    blockText = transpile(self.block)[:-2] + (backends.tabID + 1) * "\t" + f"if({transpile(self.condition)}) break;\n" + backends.tabID * "\t" + "}"
+    return f"while(1) {blockText}"
+
+def Operation(self, element = False):
+    if self.op == "MOD": self.op = "%"
+    op1 = transpile(self.op1, element)
+    op2 = transpile(self.op2, element)
+    return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
+
+def Condition(self):
+    if wholeArray(self.cp1) or wholeArray(self.cp2): raise Exception("Cannot compare whole arrays in c, compare their elements instead.")
+    cp1 = transpile(self.cp1)
+    if type(self.cp1).__name__ == "Operation": cp1 = f"({cp1})"
+
+    cp2 = transpile(self.cp2)
+    if type(self.cp2).__name__ == "Operation": cp2 = f"({cp2})"
+
+    return f"{cp1} {self.cp} {cp2}"
+
+def Identifier(self, element = False): #Elements of whole arrays are written for the loops running operations on them
+    if self.index is not None: return f"{self.value}[(long)({transpile(self.index)})]"
+    if self.isLength: return f"{self.value}_len"
+    if element and wholeArray(self): return f"{self.value}[_i]"
+    return f"\"{self.value}\"" if self.isMsg else f"{self.value}"
+
+TRANSPILERS = {
+    "Block"             : Block,
+    "LazyBlock"         : Block,
+    "Assignment"        : Assignment,
+    "WriteInstruction"  : WriteInstruction,
+    "ReadInstruction"   : ReadInstruction,
+    "ForInstruction"    : ForInstruction,
+    "IfInstruction"     : IfInstruction,
+    "WhileInstruction"  : WhileInstruction,
+    "RepeatInstruction" : RepeatInstruction,
+    "Operation"         : Operation,
+    "Condition"         : Condition,
+    "Identifier"        : Identifier,
+}
@@ -0,0 +1,118 @@
+# C++ backend, arrays work like in the c one
+import backends
+from backends import wholeArray
+from backends.c import assignArray, assignItem, readArray
+
+def transpile(node, *args): return TRANSPILERS[type(node).__name__](node, *args)
+
+def transpileProgram(root): return Block(root, isStart = True)
+
+def boilerplate(helpers = ""): return [f"#include<iostream>\n#include<cstdlib>\n\nusing namespace std;\n\n{helpers}int main() {{\n", "\n}"]
+
+def Block(self, isStart = False):
+    backends.tabID += 1
+    indent = backends.tabID * "\t"
+    text = indent + (";\n%s" % indent).join([transpile(line) for line in self.lines])
+    if len(text.lstrip()) and text[-1] != "}": text += ";"
+    backends.tabID -= 1
+    if isStart: wrapper = boilerplate(backends.arrayHelpers("CPP_READ_ARRAY"))
+    return f"{wrapper[0]}{text}{wrapper[1]}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
+
+def Assignment(self):
+    if self.index is not None: return assignItem(self, transpile)
+    if wholeArray(self.value): return assignArray(self, "cpp", transpile)
+    if backends.declared.get(self.target) == "array": raise Exception(f"Variable \"{self.target}\" can't hold both numbers and arrays in cpp.")
+    target = ""
+    if self.target not in backends.declared:
+        target = "float "
+        backends.declared[self.target] = "defined"
+    value = transpile(self.value)
+    target += f"{self.target} = "
+    if type(value) is tuple:
+        target += value[0]
+        return target, value
+
+    return f"{target}{value}"
+
+def WriteInstruction(self):
+    array = wholeArray(self.value)
+    if array: return f"for(long _i = 0; _i < {array}_len; _i++) cout << {transpile(self.value, True)} << \" \";\n" + "\t" * backends.tabID + "cout << endl"
+    return f"cout << {transpile(self.value)} << endl"
+
+def ReadInstruction(self):
+    values = []
+    indent = backends.tabID * "\t"
+    for name in self.value:
+        if name in self.arrays:
+            values.append(readArray(name, "cpp"))
+            continue
+        values.append("")
+        if name not in backends.declared:
+            values[-1] += "float "
+            backends.declared[name] = "defined"
+        values[-1] += f"{name};\n{indent}cin >> {name}"
+    return (";\n" + indent).join(values)
+
+def ForInstruction(self):
+    iterator = transpile(self.assignment)
+    if type(iterator) is tuple:
+        fromValue, toValue = iterator[1]
+        iterator = iterator[0]
+    else:
+        fromValue = 0
+        toValue = iterator[iterator.find("=") + 2:]
+
+    return f"{iterator};\n" + "\t" * backends.tabID + f"for(int _ = {fromValue}; _ < {toValue}; _++) {transpile(self.block)}"
+
+def conditional(self):
+    return "(%s) %s" % (transpile(self.condition), transpile(self.block))
+
+def IfInstruction(self):
+    text = f"if{conditional(self)}"
+    if hasattr(self, "elseBlock"):
+        text += f" else {transpile(self.elseBlock)}"
+    return text
+
+def WhileInstruction(self):
+    return f"while {conditional(self)}"
+
+def RepeatInstruction(self):
+    blockText = transpile(self.block)[:-2] + (backends.tabID + 1) * "\t" + f"if({transpile(self.condition)}) break;\n" + backends.tabID * "\t" + "}"
+    return f"while(true) {blockText}"
+
+def Operation(self, element = False):
+    if self.op == "MOD": self.op = "%"
+    op1 = transpile(self.op1, element)
+    op2 = transpile(self.op2, element)
+    return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
+
+def Condition(self):
+    if wholeArray(self.cp1) or wholeArray(self.cp2): raise Exception("Cannot compare whole arrays in cpp, compare their elements instead.")
+    cp1 = transpile(self.cp1)
+    if type(self.cp1).__name__ == "Operation": cp1 = f"({cp1})"
+
+    cp2 = transpile(self.cp2)
+    if type(self.cp2).__name__ == "Operation": cp2 = f"({cp2})"
+
+    return f"{cp1} {self.cp} {cp2}"
+
+def Identifier(self, element = False):
+    if self.index is not None: return f"{self.value}[(long)({transpile(self.index)})]"
+    if self.isLength: return f"{self.value}_len"
+    if element and wholeArray(self): return f"{self.value}[_i]"
+    return f"\"{self.value}\"" if self.isMsg else f"{self.value}"
+
+TRANSPILERS = {
+    "Block"             : Block,
+    "LazyBlock"         : Block,
+    "Assignment"        : Assignment,
+    "WriteInstruction"  : WriteInstruction,
+    "ReadInstruction"   : ReadInstruction,
+    "ForInstruction"    : ForInstruction,
+    "IfInstruction"     : IfInstruction,
+    "WhileInstruction"  : WhileInstruction,
+    "RepeatInstruction" : RepeatInstruction,
+    "Operation"         : Operation,
+    "Condition"         : Condition,
+    "Identifier"        : Identifier,
+}
@@ -0,0 +1,108 @@
+# GLib backend, postfix operations and "when" conditionals
+import backends
+from backends import rejectArrays
+
+def transpile(node, *args): return TRANSPILERS[type(node).__name__](node, *args)
+
+def transpileProgram(root): return Block(root, isStart = True)
+
+def boilerplate(): return "use std = \"std GLib\"\n\n"
+
+def Block(self, isStart = False):
+    if isStart:
+        wrapper = boilerplate()
+        backends.tabID -= 1
+    backends.tabID += 1
+    indent = backends.tabID * "\t"
+    text = indent + ("\n%s" % indent).join([transpile(line) for line in self.lines])
+    backends.tabID -= 1
+    return f"{wrapper}{text}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
+
+def Assignment(self):
+    if self.index is not None: rejectArrays("gl")
+    target = ""
+    if self.target not in backends.declared:
+        target = "make "
+        backends.declared[self.target] = "defined"
+    value = transpile(self.value)
+    target += f"{self.target} = "
+    if type(value) is tuple:
+        target += value[0]
+        return target, value
+
+    return f"{target}{value}"
+
+def WriteInstruction(self):
+    return f"print {transpile(self.value)}"
+
+def ReadInstruction(self):
+    if self.arrays: rejectArrays("gl")
+    values = []
+    indent = backends.tabID * "\t"
+    for name in self.value:
+        values.append("")
+        if name not in backends.declared:
+            values[-1] += "make "
+            backends.declared[name] = "defined"
+        values[-1] += f"{name} :num = inp"
+    return ("\n" + indent).join(values)
+
+def ForInstruction(self):
+    iterator = transpile(self.assignment)
+    if type(iterator) is tuple:
+        fromValue, toValue = iterator[1]
+        toValue += f" {fromValue} -"
+        iterator = iterator[0]
+    else:
+        fromValue = 0
+        toValue = iterator[iterator.find("=") + 2:]
+
+    return f"{iterator}\n" + "\t" * backends.tabID + f"loop {toValue} {transpile(self.block)}"
+
+def conditional(self):
+    return [transpile(self.condition), transpile(self.block)]
+
+def IfInstruction(self):
+    text = f"when " + " ".join(conditional(self))
+    if hasattr(self, "elseBlock"):
+        text += f" else {transpile(self.elseBlock)}"
+    return text
+
+def WhileInstruction(self):
+    condition, block = conditional(self)
+    return f"when {condition} loop {block}"
+
+def RepeatInstruction(self):
+    condition, block = conditional(self)
+    blockText = block[:-2] + "\n" + (backends.tabID + 1) * "\t" + f"when {condition} then exit\n" + backends.tabID * "\t" + "}"
+    return f"when TRUE loop {blockText}"
+
+def Operation(self):
+    if self.op == "MOD": self.op = "%"
+    op1 = transpile(self.op1)
+    op2 = transpile(self.op2)
+    return (op1, op2) if self.op == "TO" else f"{op1} {op2} {self.op}"
+
+def Condition(self):
+    cp1 = transpile(self.cp1)
+    cp2 = transpile(self.cp2)
+    return f"{cp1} {cp2} {self.cp}"
+
+def Identifier(self):
+    if self.index is not None or self.isLength: rejectArrays("gl")
+    return f"\"{self.value}\"" if self.isMsg else f"{self.value}"
+
+TRANSPILERS = {
+    "Block"             : Block,
+    "LazyBlock"         : Block,
+    "Assignment"        : Assignment,
+    "WriteInstruction"  : WriteInstruction,
+    "ReadInstruction"   : ReadInstruction,
+    "ForInstruction"    : ForInstruction,
+    "IfInstruction"     : IfInstruction,
+    "WhileInstruction"  : WhileInstruction,
+    "RepeatInstruction" : RepeatInstruction,
+    "Operation"         : Operation,
+    "Condition"         : Condition,
+    "Identifier"        : Identifier,
+}
@@ -0,0 +1,107 @@
+# JavaScript backend
+import backends
+from backends import rejectArrays
+
+def transpile(node, *args): return TRANSPILERS[type(node).__name__](node, *args)
+
+def transpileProgram(root): return Block(root, isStart = True)
+
+def boilerplate(): return ["(() => {\n", "\n})();"]
+
+def Block(self, isStart = False):
+    if isStart: wrapper = boilerplate()
+    backends.tabID += 1
+    indent = backends.tabID * "\t"
+    text = indent + (";\n%s" % indent).join([transpile(line) for line in self.lines])
+    if len(text.lstrip()) and text[-1] != "}": text += ";"
+    backends.tabID -= 1
+    return f"{wrapper[0]}{text}{wrapper[1]}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
+
+def Assignment(self):
+    if self.index is not None: rejectArrays("js")
+    target = ""
+    if self.target not in backends.declared:
+        target = "var "
+        backends.declared[self.target] = "defined"
+    value = transpile(self.value)
+    target += f"{self.target} = "
+    if type(value) is tuple:
+        target += value[0]
+        return target, value
+
+    return f"{target}{value}"
+
+def WriteInstruction(self):
+    return f"console.log({transpile(self.value)})"
+
+def ReadInstruction(self):
+    if self.arrays: rejectArrays("js")
+    values = []
+    for name in self.value:
+        values.append("")
+        if name not in backends.declared:
+            values[-1] += "var "
+            backends.declared[name] = "defined"
+        values[-1] += f"{name} = prompt('Program requested value for variable \"{name}\": ')"
+    return (";\n" + "\t" * backends.tabID).join(values)
+
+def ForInstruction(self):
+    iterator = transpile(self.assignment)
+    if type(iterator) is tuple:
+        fromValue, toValue = iterator[1]
+        iterator = iterator[0]
+    else:
+        fromValue = 0
+        toValue = iterator[iterator.find("=") + 2:]
+
+    return f"{iterator};\n" + "\t" * backends.tabID + f"for(let _ = {fromValue}; _ < {toValue}; _++) {transpile(self.block)}"
+
+def conditional(self):
+    return "(%s) %s" % (transpile(self.condition), transpile(self.block))
+
+def IfInstruction(self):
+    text = f"if{conditional(self)}"
+    if hasattr(self, "elseBlock"):
+        text += f" else {transpile(self.elseBlock)}"
+    return text
+
+def WhileInstruction(self):
+    return f"while{conditional(self)}"
+
+def RepeatInstruction(self):
+    blockText = transpile(self.block)[:-2] + (backends.tabID + 1) * "\t" + f"if({transpile(self.condition)}) break;\n" + backends.tabID * "\t" + "}"
+    return f"while(true) {blockText}"
+
+def Operation(self):
+    if self.op == "MOD": self.op = "%"
+    op1 = transpile(self.op1)
+    op2 = transpile(self.op2)
+    return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
+
+def Condition(self):
+    cp1 = transpile(self.cp1)
+    if type(self.cp1).__name__ == "Operation": cp1 = f"({cp1})"
+
+    cp2 = transpile(self.cp2)
+    if type(self.cp2).__name__ == "Operation": cp2 = f"({cp2})"
+
+    return f"{cp1} {self.cp} {cp2}"
+
+def Identifier(self):
+    if self.index is not None or self.isLength: rejectArrays("js")
+    return f"\"{self.value}\"" if self.isMsg else str(self.value)
+
+TRANSPILERS = {
+    "Block"             : Block,
+    "LazyBlock"         : Block,
+    "Assignment"        : Assignment,
+    "WriteInstruction"  : WriteInstruction,
+    "ReadInstruction"   : ReadInstruction,
+    "ForInstruction"    : ForInstruction,
+    "IfInstruction"     : IfInstruction,
+    "WhileInstruction"  : WhileInstruction,
+    "RepeatInstruction" : RepeatInstruction,
+    "Operation"         : Operation,
+    "Condition"         : Condition,
+    "Identifier"        : Identifier,
+}
@@ -0,0 +1,103 @@
+# Python backend
+import backends
+from backends import wholeArray
+
+def transpile(node, *args): return TRANSPILERS[type(node).__name__](node, *args)
+
+def transpileProgram(root): return Block(root, isStart = True)
+
+def boilerplate(helpers = ""): return [f"{helpers}def main():\n", "\n\nif __name__ == '__main__': main()"]
+
+def Block(self, isStart = False):
+    backends.tabID += 1
+    indent = backends.tabID * "\t"
+    text = indent + ("\n%s" % indent).join([transpile(line) for line in self.lines])
+    backends.tabID -= 1
+    if isStart: wrapper = boilerplate(backends.arrayHelpers("PY_READ_ARRAY"))
+    return f"{wrapper[0]}{text}{wrapper[1]}" if isStart else ("\n%s" % text)
+
+def Assignment(self):
+    value = transpile(self.value)
+    if self.index is not None: return f"{self.target}[{indexText(self.target, self.index)}] = {value}"
+    backends.declared[self.target] = "array" if wholeArray(self.value) else "defined"
+    target = f"{self.target} = "
+    if type(value) is tuple:
+        target += value[0]
+        return target, value
+
+    return f"{target}{value}"
+
+def WriteInstruction(self):
+    return f"print({'*' if wholeArray(self.value) else ''}{transpile(self.value)})"
+
+def ReadInstruction(self):
+    values = []
+    for name in self.value:
+        if name in self.arrays:
+            backends.declared[name] = "array"
+            values.append(f"{name} = readArray('{name}')")
+        else: values.extend((f"{name} = input('Program requested value for variable \"{name}\": ')", f"{name} = float({name}) if '.' in {name} else int({name})")) #Typed like the interpreter does, FOR can only loop an int number of times
+    return ("\n" + "\t" * backends.tabID).join(values)
+
+def ForInstruction(self):
+    iters = transpile(self.assignment)
+    if type(iters) is tuple:
+        iterLen = f"{iters[1][0]}, {iters[1][1]}"
+        iters = iters[0]
+    else: iterLen = iters[iters.find("=") + 2:]
+
+    return "%s\n%sfor _ in range(%s):%s" % (iters, '\t' * backends.tabID, iterLen, transpile(self.block))
+
+def conditional(self):
+    return "%s:%s" % (transpile(self.condition), transpile(self.block))
+
+def IfInstruction(self):
+    text = f"if {conditional(self)}"
+    if hasattr(self, "elseBlock"):
+        text += "\n" + "\t" * backends.tabID + f"else:{transpile(self.elseBlock)}"
+    return text
+
+def WhileInstruction(self):
+    return f"while {conditional(self)}"
+
+def RepeatInstruction(self):
+    blockText = transpile(self.block) + "\n" + (backends.tabID + 1) * "\t" + f"if {transpile(self.condition)}: break\n"
+    return f"while True:{blockText}"
+
+def Operation(self):
+    if self.op == "MOD": self.op = "%"
+    op1 = transpile(self.op1)
+    op2 = transpile(self.op2)
+    return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
+
+def Condition(self):
+    cp1 = transpile(self.cp1)
+    if type(self.cp1).__name__ == "Operation": cp1 = f"({cp1})"
+
+    cp2 = transpile(self.cp2)
+    if type(self.cp2).__name__ == "Operation": cp2 = f"({cp2})"
+
+    return f"{cp1} {self.cp} {cp2}"
+
+def indexText(name, index): #Checked like the interpreter does, int() alone would truncate 1.5 and let negative indexes wrap around
+    return f"arrayIndex({name}, {transpile(index)}, '{name}')"
+
+def Identifier(self):
+    if self.index is not None: return f"{self.value}[{indexText(self.value, self.index)}]"
+    if self.isLength: return f"len({self.value})"
+    return f"\"{self.value}\"" if self.isMsg else str(self.value)
+
+TRANSPILERS = {
+    "Block"             : Block,
+    "LazyBlock"         : Block,
+    "Assignment"        : Assignment,
+    "WriteInstruction"  : WriteInstruction,
+    "ReadInstruction"   : ReadInstruction,
+    "ForInstruction"    : ForInstruction,
+    "IfInstruction"     : IfInstruction,
+    "WhileInstruction"  : WhileInstruction,
+    "RepeatInstruction" : RepeatInstruction,
+    "Operation"         : Operation,
+    "Condition"         : Condition,
+    "Identifier"        : Identifier,
+}
@@ -0,0 +1,291 @@
+#Parser benchmark: times the recursive Parser against the table-driven TableParser on generated programs, the LL(1) table generation against loading the cached tables,
+#the recursive pipeline (Parser, nested exec calls) against the explicit stack one on deeply nested programs, both building the AST from buildTree's stack,
+#the peak memory of running whole programs against streaming them one statement at a time, parsing programs against loading their binary ASTs along with the time of both dumps,
+#running loops with and without common-subexpression elimination, running nested loops built eagerly and lazily, and the startup time of main.py's commands against its budget.
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import astdump
+import grammar
+import interpreter
+from grammar import GrammarCompiler, TableParser
+from parser import Parser
+
+STATEMENTS = [
+    "x{i} <- {i} * 2 # double",
+    "IF x{i} > {i} THEN WRITE x{i} ELSE WRITE \"small\"",
+    "FOR k <- 0 TO {i} DO {{\n    y <- y + k\n}}",
+    "WHILE y < {i} DO y <- y + 1",
+    "REPEAT {{\n    y <- y - 1\n}} UNTIL y < 0",
+]
+
+STARTUP_BUDGET = 150 #Milliseconds a command may take on top of starting a bare Python, the job runner invokes the tool thousands of times a day
+BENCHMARKS = ("parsers", "tables", "depths", "streamed", "dumps", "cse", "lazy", "startup")
+
+NESTING = [ #Opening and closing lines of the nested statements, none of them changes x before the innermost line does
+    ("IF x < 1 THEN {", "}"),
+    ("FOR i <- 0 TO 1 DO {", "}"),
+    ("REPEAT {", "} UNTIL x > 0"),
+]
+
+LAZY_LOOPS = { #Loops holding IFs, a lazy build settles the IF once its Blocks are built, then each node holding it up to the loop. The repeat count is the innermost iterations
+    "WHILE > IF" : [
+        "i <- 0",
+        "WHILE i < {repeats} DO {{",
+        "    i <- i + 1",
+        "    IF i > 5 THEN {{",
+        "        x <- i",
+        "    }} ELSE {{",
+        "        x <- 0",
+        "    }}",
+        "}}",
+    ],
+    "FOR > REPEAT > IF" : [
+        "j <- 0",
+        "FOR k <- 0 TO {outer} DO {{",
+        "    j <- 0",
+        "    REPEAT {{",
+        "        j <- j + 1",
+        "        IF j > 2 THEN x <- j",
+        "    }} UNTIL j > 9",
+        "}}",
+    ],
+}
+
+STREAMED = [ #Straight-line statements, so the running time and the variables stay linear in the program size
+    "x <- x + {i} # step {i}",
+    "IF x > {i} THEN y <- x - {i} ELSE y <- {i}",
+    "REPEAT {{\n    y <- y + 1\n}} UNTIL y > 0",
+]
+
+REDUNDANT = [ #Loop body computing i * 3 and i + 1 again while i doesn't change, the repeat count is the iterations
+    "i <- 0",
+    "s <- 0",
+    "WHILE i < {repeats} DO {{",
+    "    a <- i * 3",
+    "    IF i * 3 > 10 THEN s <- s + 1 ELSE s <- s - 1",
+    "    b <- 1 + i",
+    "    c <- a + b",
+    "    d <- i * 3",
+    "    i <- i + 1",
+    "}}",
+    "WRITE s",
+]
+
+def generateProgram(lines):
+    return "\n".join(["y <- 0", *(STATEMENTS[i % len(STATEMENTS)].format(i = i) for i in range(lines))])
+
+def generateNestedProgram(depth):
+    levels = [NESTING[i % len(NESTING)] for i in range(depth)]
+    return "\n".join(["x <- 0", *(opening for opening, _ in levels), "x <- x + 1", *(closing for _, closing in reversed(levels)), "WRITE x"])
+
+def bestTime(function, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchParsers(sizes, repeats):
+    grammar.getParseTable()
+    rows = []
+    for lines in sizes:
+        program = generateProgram(lines)
+        if Parser(program).parse() != TableParser(program).parse(): raise Exception(f"Parsers disagree on the generated {lines} lines program.")
+        recursive = bestTime(lambda: Parser(program).parse(), repeats)
+        table = bestTime(lambda: TableParser(program).parse(), repeats)
+        rows.append((f"{lines} lines", f"{len(program) / 1024:.0f} KiB", f"{recursive * 1000:.1f}", f"{table * 1000:.1f}", f"x{recursive / table:.2f}"))
+    return [("program", "size", "Parser (ms)", "TableParser (ms)", "speedup"), *rows]
+
+def benchTables(repeats):
+    with open(grammar.GRAMMAR_FILE) as fd: grammarText = fd.read()
+    generate = bestTime(lambda: GrammarCompiler(grammarText).compile(), repeats)
+    grammar.loadTables() #Makes sure the cache file exists before timing the cached path
+    cached = bestTime(grammar.loadTables, repeats)
+    return [("tables", "time (ms)"), ("generated", f"{generate * 1000:.2f}"), ("cached", f"{cached * 1000:.2f}")]
+
+def runPipeline(program, parserClass, inlineDepth): #Returns the parse, build and run times, with inlineDepth as the nesting that still runs with plain calls
+    times = []
+    start = time.perf_counter()
+    program = parserClass(program).parse()
+    times.append(time.perf_counter() - start)
+
+    defaultDepth, interpreter.INLINE_DEPTH = interpreter.INLINE_DEPTH, inlineDepth
+    try:
+        start = time.perf_counter()
+        root = interpreter.buildTree(program)
+        times.append(time.perf_counter() - start)
+    finally: interpreter.INLINE_DEPTH = defaultDepth
+
+    interpreter.runtime_vars = {}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): interpreter.runTree(root)
+    times.append(time.perf_counter() - start)
+    if interpreter.runtime_vars.get("x") != 1: raise Exception("Nested program computed the wrong result.")
+    return times
+
+def benchDepths(depths):
+    rows = [("depth", "pipeline", "parse (ms)", "build (ms)", "run (ms)")]
+    for depth in depths:
+        program = generateNestedProgram(depth)
+        for pipeline, parserClass, inlineDepth in (("recursive", Parser, float("inf")), ("explicit stack", TableParser, interpreter.INLINE_DEPTH)):
+            try: rows.append((str(depth), pipeline, *(f"{phase * 1000:.1f}" for phase in runPipeline(program, parserClass, inlineDepth))))
+            except RecursionError: rows.append((str(depth), pipeline, "RecursionError", "-", "-"))
+    return rows
+
+def generateStreamedProgram(lines):
+    return "\n".join(["x <- 0", *(STREAMED[i % len(STREAMED)].format(i = i) for i in range(lines)), "WRITE x"])
+
+def peakMemory(function): #Peak of the memory allocated by function, in bytes
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): function()
+        return tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+
+def runWhole(fileName):
+    with open(fileName) as fd: interpreter.Interpreter(fd.read()).exec()
+
+def benchStreaming(sizes, repeats):
+    rows = [("program", "size", "whole (MiB)", "streamed (MiB)", "whole (ms)", "streamed (ms)")]
+    with tempfile.TemporaryDirectory() as directory:
+        fileName = os.path.join(directory, "streamed.sudo")
+        for lines in sizes:
+            with open(fileName, "w") as fd: fd.write(generateStreamedProgram(lines))
+            results = []
+            for function in (lambda: runWhole(fileName), lambda: interpreter.StreamInterpreter(fileName).run()):
+                results.append((peakMemory(function), bestTime(function, repeats)))
+                if interpreter.runtime_vars["x"] != sum(range(0, lines, len(STREAMED))): raise Exception("Streamed program computed the wrong result.")
+            rows.append((f"{lines} lines", f"{os.path.getsize(fileName) / 1024:.0f} KiB", *(f"{memory / 2**20:.1f}" for memory, _ in results), *(f"{runTime * 1000:.1f}" for _, runTime in results)))
+    return rows
+
+def benchDumps(sizes, repeats):
+    rows = [("program", "source (KiB)", "binary (KiB)", "parse (ms)", "binary load (ms)", "text dump (ms)", "binary dump (ms)")]
+    for lines in sizes:
+        source = generateProgram(lines)
+        program = TableParser(source).parse()
+        binary = io.BytesIO()
+        astdump.dumpBinary(program, binary)
+        if astdump.loadBinary(binary.getvalue()) != program: raise Exception("Binary AST loaded a different program.")
+        times = [
+            bestTime(lambda: TableParser(source).parse(), repeats),
+            bestTime(lambda: astdump.loadBinary(binary.getvalue()), repeats),
+            bestTime(lambda: astdump.dumpText(program, io.StringIO()), repeats),
+            bestTime(lambda: astdump.dumpBinary(program, io.BytesIO()), repeats),
+        ]
+        rows.append((f"{lines} lines", f"{len(source) / 1024:.0f}", f"{len(binary.getvalue()) / 1024:.0f}", *(f"{phase * 1000:.1f}" for phase in times)))
+    return rows
+
+def benchCse(iterations, repeats):
+    import cse
+    rows = [("iterations", "eliminated per iteration", "plain (ms)", "cse (ms)", "speedup")]
+    source = "\n".join(REDUNDANT)
+    for count in iterations:
+        program = TableParser(source.format(repeats = count)).parse()
+        rewritten, reused = cse.eliminate(program)
+        times = []
+        for ast in (program, rewritten):
+            tree = interpreter.buildTree(ast)
+            times.append(bestTime(lambda: interpreter.runTree(tree), repeats))
+        rows.append((str(count), str(sum(value.reuses for value in reused)), *(f"{runTime * 1000:.1f}" for runTime in times), f"x{times[0] / times[1]:.2f}"))
+    return rows
+
+def runTime(source, repeats, **toggles): #Best time of the run phase alone, every run gets a freshly built Interpreter as lazy builds change it while running
+    best = float("inf")
+    for _ in range(repeats):
+        program = interpreter.Interpreter(source, **toggles)
+        with contextlib.redirect_stdout(io.StringIO()):
+            program.build()
+            start = time.perf_counter()
+            program.run()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def benchLazy(iterations, repeats): #Lazy builds only pay while Blocks are built, once they all settle the loops run like eager ones
+    rows = [("program", "iterations", "eager (ms)", "lazy (ms)", "lazy overhead")]
+    for name, lines in LAZY_LOOPS.items():
+        for count in iterations:
+            source = "\n".join(lines).format(repeats = count, outer = count // 10)
+            eager, lazy = runTime(source, repeats), runTime(source, repeats, toggle_lazyBuild = True)
+            rows.append((name, str(count), f"{eager * 1000:.1f}", f"{lazy * 1000:.1f}", f"{(lazy / eager - 1) * 100:+.0f}%"))
+    return rows
+
+def startupTime(command, repeats): #Best wall time of a whole process, in seconds
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output = True, text = True)
+        best = min(best, time.perf_counter() - start)
+        if result.returncode: raise Exception(f"Command \"{' '.join(command)}\" failed: {result.stderr.strip()}")
+    return best
+
+def importedModules(command): #Modules the command imports besides Python's own startup ones, as listed by -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", *command[1:]], capture_output = True, text = True)
+    baseline = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output = True, text = True)
+    names = lambda output: {line.rsplit("|", 1)[1].strip() for line in output.splitlines() if line.startswith("import time:") and "|" in line}
+    return names(result.stderr) - names(baseline.stderr)
+
+def benchStartup(repeats, budget):
+    rows = [("command", "time (ms)", "over python (ms)", "budget", "lazy modules loaded")]
+    bare = startupTime([sys.executable, "-c", "pass"], repeats)
+    with tempfile.TemporaryDirectory() as directory:
+        fileName = os.path.join(directory, "startup.sudo")
+        with open(fileName, "w") as fd: fd.write(generateStreamedProgram(20))
+        commands = {
+            "check"          : ["check", fileName],
+            "run"            : ["run", fileName],
+            "transpile py"   : ["transpile", fileName, "--lang", "py"],
+            "transpile c,py" : ["transpile", fileName, "--lang", "c,py"],
+        }
+        for name, arguments in commands.items():
+            command = [sys.executable, "main.py", *arguments]
+            overhead = startupTime(command, repeats) - bare
+            lazyModules = sorted(module for module in importedModules(command) if module.split(".")[0] in ("backends", "metrics", "checkpoint", "arrays", "bench", "numpy", "hashlib", "cse"))
+            rows.append((name, f"{(bare + overhead) * 1000:.1f}", f"{overhead * 1000:.1f}", "ok" if overhead * 1000 <= budget else "OVER", ", ".join(lazyModules) or "-"))
+    return rows
+
+def printTable(rows):
+    widths = [max(len(row[col]) for row in rows) for col in range(len(rows[0]))]
+    for row in rows: print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+def main(argv = None): #Returns the exit status, 1 when a command goes over the startup budget
+    argParser = argparse.ArgumentParser(prog = "bench.py", description = "Benchmark the recursive and the table-driven parsers, streamed execution, AST dumps, common-subexpression elimination and the startup time.")
+    argParser.add_argument("--benchmarks", default = ",".join(BENCHMARKS), help = f"comma separated benchmarks to run among {', '.join(BENCHMARKS)}")
+    argParser.add_argument("--sizes", default = "1000,5000,10000", help = "comma separated line counts of the generated programs")
+    argParser.add_argument("--repeats", type = int, default = 3, help = "runs per measure, the best one is kept")
+    argParser.add_argument("--depths", default = "100,1000,10000,20000", help = "comma separated nesting depths of the generated deep programs")
+    argParser.add_argument("--streamed", default = "2000,20000", help = "comma separated line counts of the generated straight-line programs run whole and streamed")
+    argParser.add_argument("--iterations", default = "10000,100000", help = "comma separated loop iterations of the programs run with and without common-subexpression elimination, and eagerly and lazily built")
+    argParser.add_argument("--startup-budget", type = float, default = STARTUP_BUDGET, help = "milliseconds a command may add to a bare Python startup")
+    args = argParser.parse_args(argv)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    tables = {
+        "parsers"  : lambda: benchParsers([int(size) for size in args.sizes.split(",") if size], args.repeats),
+        "tables"   : lambda: benchTables(args.repeats),
+        "depths"   : lambda: benchDepths([int(depth) for depth in args.depths.split(",") if depth]),
+        "streamed" : lambda: benchStreaming([int(size) for size in args.streamed.split(",") if size], args.repeats),
+        "dumps"    : lambda: benchDumps([int(size) for size in args.sizes.split(",") if size], args.repeats),
+        "cse"      : lambda: benchCse([int(count) for count in args.iterations.split(",") if count], args.repeats),
+        "lazy"     : lambda: benchLazy([int(count) for count in args.iterations.split(",") if count], args.repeats),
+        "startup"  : lambda: benchStartup(max(args.repeats, 5), args.startup_budget),
+    }
+    status = 0
+    for benchmarkID, benchmark in enumerate(name for name in args.benchmarks.split(",") if name):
+        if benchmark not in tables: raise Exception(f"Unknown benchmark \"{benchmark}\", choose among {', '.join(BENCHMARKS)}.")
+        if benchmarkID: print()
+        rows = tables[benchmark]()
+        printTable(rows)
+        if benchmark == "startup" and any(row[3] == "OVER" for row in rows[1:]): status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
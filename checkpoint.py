@@ -0,0 +1,71 @@
+# Module for periodically saving and reloading the execution state of long running programs
+import json
+import os
+import tempfile
+import time
+
+TIME_CHECK_STEPS = 1024 #How many steps may run between two clock reads when checkpointing every T seconds
+
+class Checkpointer:
+    def __init__(self, fileName, everySteps = None, everySeconds = None):
+        if everySteps is None and everySeconds is None: raise Exception("Checkpointer needs a step interval, a time interval or both.")
+        self.fileName = fileName
+        self.everySteps = everySteps
+        self.everySeconds = everySeconds
+        self.program = None
+        self.reset()
+
+    def reset(self, steps = 0):
+        self.steps = steps
+        self.nextStepSave = steps + self.everySteps if self.everySteps else float("inf")
+        self.lastSaveTime = time.monotonic()
+        self.scheduleCheck()
+
+    def scheduleCheck(self):
+        self.nextCheck = min(self.nextStepSave, self.steps + TIME_CHECK_STEPS) if self.everySeconds else self.nextStepSave
+
+    def check(self, variables, getPosition): #Called by the interpreter once self.steps reaches self.nextCheck, the position is only built when saving
+        if self.steps >= self.nextStepSave or time.monotonic() - self.lastSaveTime >= self.everySeconds:
+            self.save(variables, getPosition())
+            self.reset(self.steps)
+        else: self.scheduleCheck()
+
+    def save(self, variables, position):
+        snapshot = {
+            "program"   : self.program,
+            "steps"     : self.steps,
+            "variables" : variables,
+            "position"  : position,
+        }
+        directory = os.path.dirname(os.path.abspath(self.fileName))
+        fd, tempName = tempfile.mkstemp(dir = directory, prefix = ".checkpoint-")
+        try:
+            os.chmod(tempName, 0o666 & ~currentUmask()) #mkstemp makes it private, checkpoints get the mode of any file the user creates
+            with os.fdopen(fd, "w") as tempFile:
+                json.dump(snapshot, tempFile)
+                tempFile.flush()
+                os.fsync(tempFile.fileno()) #On disk before it replaces the previous checkpoint, a crash right after never leaves an empty file
+            os.replace(tempName, self.fileName)
+        except BaseException:
+            os.unlink(tempName)
+            raise
+        syncDirectory(directory)
+
+def currentUmask(): #Only readable by setting it, so it's set back right away
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+def syncDirectory(directory): #Makes the rename itself durable, where directories can be opened
+    try: fd = os.open(directory, os.O_RDONLY)
+    except OSError: return
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+def loadCheckpoint(fileName, program):
+    try:
+        with open(fileName) as fd: snapshot = json.load(fd)
+    except (OSError, ValueError): raise Exception(f"Couldn't load checkpoint \"{fileName}\": file missing or corrupted.") from None
+    if snapshot["program"] != program: raise Exception(f"Checkpoint \"{fileName}\" was taken from a different program.")
+    return snapshot
@@ -0,0 +1,166 @@
+# Module for common-subexpression elimination, only imported by Interpreters built with toggle_cse
+# Rewrites the dict AST between parsing and building: an Operation evaluated again while none of its operands changed reads the value computed the first time instead,
+# from the variable it was assigned to or from a "_tN" temporary assigned right before the line computing it. WORDs can't start with "_", so temporaries never clash with program variables
+ITEMS = "[]" #Pseudo-variable read by every array item, assigning one item may change the others through aliased arrays
+COMMUTATIVE = ("+", "*")
+BLOCK_FIELDS = ("block", "else")
+
+class Value: #An Operation computed once and read again, deps are the (variable, version) pairs it was computed from
+    def __init__(self, node, deps, name = None):
+        self.node = node
+        self.deps = deps
+        self.name = name       #Variable holding the value, temporaries are only named once the value is reused
+        self.temporary = False #Whether the pass has to assign the name itself
+        self.reuses = 0
+
+    def text(self): return f"{self.name} <- {operandText(self.node['op1'])} {self.node['operand']} {operandText(self.node['op2'])}"
+
+def operandText(node):
+    if "index" in node: return f"{node['value']}[{operandText(node['index'])}]"
+    if "length" in node: return f"{node['value']}[]"
+    return str(node["value"])
+
+def operandKey(node, arrays): #Returns the key of the operand and the variables it reads, None for whole arrays as their operations build new ones every time
+    if not node["isVar"]: return ("number", type(node["value"]).__name__, node["value"]), ()
+    name = node["value"]
+    if "index" in node:
+        indexKey, indexNames = operandKey(node["index"], arrays)
+        return ("item", name, indexKey), (name, ITEMS, *indexNames)
+    if "length" in node: return ("length", name), (name,)
+    if name in arrays: return None
+    return ("variable", name), (name,)
+
+def expressionKey(node, arrays): #Returns the key of the Operation and the variables it reads, None when it can't be reused
+    if node["type"] != "Operation" or node["operand"] == "TO": return None
+    operands = [operandKey(node["op1"], arrays), operandKey(node["op2"], arrays)]
+    if None in operands: return None
+    if node["operand"] in COMMUTATIVE: operands.sort(key = repr)
+    return (node["operand"], operands[0][0], operands[1][0]), operands[0][1] + operands[1][1]
+
+def ownNames(line): #Variables the line assigns itself, leaving out the ones of its Blocks
+    if line["type"] == "Assignment": return (line["target"], ITEMS) if "index" in line else (line["target"],)
+    if line["type"] == "READ-INSTR": return tuple(line["value"]) if type(line["value"]) is list else (line["value"],)
+    if line["type"] == "FOR-INSTR": return (line["iters"]["target"],)
+    return ()
+
+def blockFields(line): return [field for field in BLOCK_FIELDS if field in line]
+
+def scanProgram(program): #Returns the variables assigned within every compound line, by id, the ones that may hold arrays and all of them
+    assigned = {}
+    arrays = set()
+    variables = set()
+    assignments = []
+    stack = [(line, None) for line in program["value"]]
+    while stack:
+        line, children = stack.pop()
+        if children is not None: #Visited after all the lines of its Blocks
+            names = set(ownNames(line))
+            for child in children: names.update(assigned[id(child)] if id(child) in assigned else ownNames(child))
+            assigned[id(line)] = names
+            continue
+        kind = line["type"]
+        variables.update(ownNames(line))
+        if kind == "READ-INSTR": arrays.update(line.get("arrays", ()))
+        elif kind == "Assignment":
+            if "index" in line: arrays.add(line["target"])
+            else: assignments.append((line["target"], line["value"]))
+        elif kind != "WRITE-INSTR":
+            children = [child for field in blockFields(line) for child in line[field]["value"]]
+            stack.append((line, children))
+            stack.extend((child, None) for child in children)
+
+    grown = True
+    while grown: #A variable assigned a whole array, or an operation on one, holds an array too
+        grown = False
+        for target, value in assignments:
+            operands = [value["op1"], value["op2"]] if value["type"] == "Operation" else [value]
+            if target not in arrays and any(operand["isVar"] and "index" not in operand and "length" not in operand and operand["value"] in arrays for operand in operands):
+                arrays.add(target)
+                grown = True
+    return assigned, arrays, variables
+
+def rebuild(block, entries): #Returns the Block with its lines rewritten, or the same one when none of them changed
+    lines = []
+    for line, occurrences, computed, blocks in entries:
+        for value in computed:
+            if value.temporary and value.reuses: lines.append({"type" : "Assignment", "target" : value.name, "value" : value.node})
+        replacements = [(path, value.name) for path, value, isFirst in occurrences if value.reuses and (value.temporary or not isFirst)]
+        if replacements or blocks:
+            line = {**line, **blocks}
+            for path, name in replacements:
+                node = {"type" : "Identifier", "isVar" : True, "value" : name}
+                if len(path) == 1: line[path[0]] = node
+                else: line[path[0]] = {**line[path[0]], path[1] : node}
+        lines.append(line)
+    if len(lines) == len(block["value"]) and all(new is old for new, old in zip(lines, block["value"])): return block
+    return {**block, "value" : lines}
+
+def eliminate(program): #Returns the rewritten program and the Values it reused, nodes are copied before being changed as INCLUDEd modules share theirs
+    assigned, arrays, variables = scanProgram(program) #Programs already rewritten, like binary ASTs dumped with --cse, hold temporaries of their own
+    available = {} #Expression key -> Value of the expressions computed so far by the Blocks being visited
+    versions = {}  #Variable -> times it was assigned so far, a Value holds while the versions of its deps stay the same
+    reused = []
+    temporaries = 0
+
+    def kill(names):
+        for name in names: versions[name] = versions.get(name, 0) + 1
+
+    def visit(entry, path, node, undo, canCompute = True, target = None): #Reads the expression at path in the line of entry, returns the Value it is computed into the first time
+        nonlocal temporaries
+        found = expressionKey(node, arrays)
+        if found is None: return None
+        key, names = found
+        value = available.get(key)
+        if value is not None and all(versions.get(name, 0) == version for name, version in value.deps):
+            if not value.reuses: reused.append(value)
+            if value.name is None:
+                while f"_t{temporaries}" in variables: temporaries += 1
+                value.name = f"_t{temporaries}"
+                value.temporary = True
+                temporaries += 1
+            value.reuses += 1
+            entry[1].append((path, value, False))
+            return None
+        if not canCompute or target in names: return None #x <- x + 1 changes its own operand
+        value = Value(node, tuple((name, versions.get(name, 0)) for name in names), target)
+        undo.append((key, available.get(key)))
+        available[key] = value
+        entry[1].append((path, value, True))
+        entry[2].append(value)
+        return value
+
+    def visitCondition(entry, undo, canCompute = True):
+        for side in ("cp1", "cp2"): visit(entry, ("cond", side), entry[0]["cond"][side], undo, canCompute)
+
+    stack = [[program, 0, [], [], None]] #[Block, next line, entries, undo, (parent entry, field)], entries being [line, occurrences, Values computed, new Blocks]
+    while stack:
+        frame = stack[-1]
+        block, lineID, entries, undo, parent = frame
+        if lineID == len(block["value"]): #Values computed by a Block are forgotten once it ends, it may not run at all
+            stack.pop()
+            if parent is not None and parent[0][0]["type"] == "REPEAT-INSTR": visitCondition(parent[0], undo, canCompute = False) #UNTIL runs right after the Block
+            newBlock = rebuild(block, entries)
+            for key, value in reversed(undo):
+                if value is None: del available[key]
+                else: available[key] = value
+            if parent is None: return newBlock, reused
+            entry, field = parent
+            if newBlock is not entry[0][field]: entry[3][field] = newBlock
+            continue
+
+        line = block["value"][lineID]
+        frame[1] += 1
+        entry = [line, [], [], {}]
+        entries.append(entry)
+        kind = line["type"]
+        if kind == "Assignment":
+            value = visit(entry, ("value",), line["value"], undo, target = None if "index" in line else line["target"])
+            kill(ownNames(line))
+            if value is not None and value.name is not None: value.deps += ((value.name, versions[value.name]),)
+        elif kind == "WRITE-INSTR": visit(entry, ("value",), line["value"], undo)
+        elif kind == "READ-INSTR": kill(ownNames(line))
+        elif kind == "IF-INSTR": visitCondition(entry, undo)
+        elif kind in ("FOR-INSTR", "WHILE-INSTR", "REPEAT-INSTR"): #Loops run their Block again after it assigned its variables, so those count as changed from the start
+            kill(assigned[id(line)])
+            if kind == "WHILE-INSTR": visitCondition(entry, undo, canCompute = False)
+        for field in reversed(blockFields(line)): stack.append([line[field], 0, [], [], (entry, field)]) #The ELSE Block is visited after the THEN one
@@ -0,0 +1,561 @@
+# Module generating LL(1) parse tables from grammar.txt and parsing programs with them
+import marshal
+import os
+import re
+import zlib
+from functools import partial
+from tokenizer import tokenPatterns
+from parser import MODULES_DIRECTORY, ModuleParser, includeModule, printNode, requireUntil
+
+GRAMMAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar.txt")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+GENERATOR_VERSION = 2 #Bump whenever the table layout changes, so stale cached tables get regenerated
+STREAM_CHUNK = 1 << 16 #Characters read at a time by streamTokens
+
+LEXICAL_TOKENS = { #Regex rules of grammar.txt and the tokenizer types that implement them
+    "Operand"    : "operand",
+    "Message"    : "message",
+    "WORD"       : "WORD",
+    "NUMBER"     : "NUMBER",
+    "Comparison" : "comparison",
+    "Comment"    : None,
+}
+LITERAL_TOKENS = { #Quoted literals of grammar.txt that aren't keywords
+    "\n" : "newline",
+    "<-" : "arrow",
+    "{"  : "openBlock",
+    "}"  : "closeBlock",
+    ","  : ",",
+    "["  : "[",
+    "]"  : "]",
+}
+END = "$"
+
+grammarPatterns = [
+    [r"^\s+", None],
+    ["^\"(\\\\.|[^\"\\\\])*\"", "literal"],
+    ["^/(\\\\.|[^/\\\\])*/", "regex"],
+    [r"^[a-zA-Z_]\w*", "name"],
+    ["^[()|*+?]", "symbol"],
+]
+
+def tokenizeRule(text):
+    tokens = []
+    while text:
+        for [regexp, tokenType] in grammarPatterns:
+            _match = re.search(regexp, text)
+            if _match is None: continue
+            text = text[len(_match.group()):]
+            if tokenType is not None: tokens.append((tokenType, _match.group()))
+            break
+        else: raise Exception(f"Unexpected grammar text: \"{text}\"")
+    return tokens
+
+class GrammarCompiler: #Turns the EBNF rules of grammar.txt into plain productions, then into an LL(1) table
+    def __init__(self, grammarText):
+        self.rules = {}
+        for line in grammarText.splitlines():
+            if not line.strip(): continue
+            name, _, body = line.partition(":==")
+            self.rules[name.strip()] = tokenizeRule(body)
+
+        self.ruleNames, self.ruleIDs = [], {}
+        self.productions = [] #[ruleID, symbols, isAction], symbols are ruleIDs or terminal keys
+        self.terminals = {}
+        for name, tokens in self.rules.items():
+            if len(tokens) == 1 and tokens[0][0] == "regex":
+                if name not in LEXICAL_TOKENS: raise Exception(f"Lexical rule \"{name}\" has no matching tokenizer type.")
+                if LEXICAL_TOKENS[name] is not None: self.terminals[name] = LEXICAL_TOKENS[name]
+
+        self.helperCount = 0
+        for name, tokens in self.rules.items():
+            if name in LEXICAL_TOKENS: continue
+            self.cursor, self.tokens = 0, tokens
+            for symbols in self.alternatives(name): self.productions.append([self.ruleID(name), symbols, True])
+            if self.cursor != len(tokens): raise Exception(f"Unbalanced grammar rule \"{name}\".")
+
+    def peek(self):
+        return self.tokens[self.cursor] if self.cursor < len(self.tokens) else (None, None)
+
+    def alternatives(self, ruleName):
+        alternatives = [self.sequence(ruleName)]
+        while self.peek() == ("symbol", "|"):
+            self.cursor += 1
+            alternatives.append(self.sequence(ruleName))
+        return alternatives
+
+    def sequence(self, ruleName):
+        symbols = []
+        while self.peek()[0] is not None and self.peek() not in (("symbol", "|"), ("symbol", ")")):
+            symbol = self.item(ruleName)
+            suffix = self.peek()
+            if suffix in (("symbol", "*"), ("symbol", "+"), ("symbol", "?")):
+                self.cursor += 1
+                symbol = self.repeat(ruleName, symbol, suffix[1])
+            symbols.append(symbol)
+        return symbols
+
+    def item(self, ruleName):
+        tokenType, value = self.tokens[self.cursor]
+        self.cursor += 1
+        if tokenType == "literal":
+            import json
+            literal = json.loads(value)
+            return LITERAL_TOKENS.get(literal, literal)
+        if tokenType == "name":
+            if value not in self.rules: raise Exception(f"Grammar rule \"{ruleName}\" references undefined rule \"{value}\".")
+            return self.terminals[value] if value in self.terminals else self.ruleID(value)
+        if (tokenType, value) != ("symbol", "("): raise Exception(f"Unexpected \"{value}\" in grammar rule \"{ruleName}\".")
+
+        helper = self.helper(ruleName)
+        for symbols in self.alternatives(ruleName): self.productions.append([helper, symbols, False])
+        if self.peek() != ("symbol", ")"): raise Exception(f"Missing \")\" in grammar rule \"{ruleName}\".")
+        self.cursor += 1
+        return helper
+
+    def repeat(self, ruleName, symbol, suffix): #Helper rules are transparent, their values end up among the ones of the rule using them
+        helper = self.helper(ruleName)
+        if suffix == "?": self.productions += [[helper, [symbol], False], [helper, [], False]]
+        else:
+            loop = helper if suffix == "*" else self.helper(ruleName)
+            self.productions += [[loop, [symbol, loop], False], [loop, [], False]]
+            if suffix == "+": self.productions.append([helper, [symbol, loop], False])
+        return helper
+
+    def helper(self, ruleName):
+        self.helperCount += 1
+        return self.ruleID(f"{ruleName}#{self.helperCount}")
+
+    def ruleID(self, name):
+        if name not in self.ruleIDs:
+            self.ruleIDs[name] = len(self.ruleNames)
+            self.ruleNames.append(name)
+        return self.ruleIDs[name]
+
+    def isRule(self, symbol): return type(symbol) is int
+
+    def compile(self):
+        first = [set() for _ in self.ruleNames]
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for name, symbols, _ in self.productions:
+                symbolsFirst, symbolsNullable = self.firstOf(symbols, first, nullable)
+                if not symbolsFirst <= first[name]:
+                    first[name] |= symbolsFirst
+                    changed = True
+                if symbolsNullable and name not in nullable:
+                    nullable.add(name)
+                    changed = True
+
+        follow = [set() for _ in self.ruleNames]
+        follow[self.ruleIDs["Program"]].add(END)
+        changed = True
+        while changed:
+            changed = False
+            for name, symbols, _ in self.productions:
+                for symbolID, symbol in enumerate(symbols):
+                    if not self.isRule(symbol): continue
+                    restFirst, restNullable = self.firstOf(symbols[symbolID + 1:], first, nullable)
+                    if restNullable: restFirst = restFirst | follow[name]
+                    if not restFirst <= follow[symbol]:
+                        follow[symbol] |= restFirst
+                        changed = True
+
+        table = [{} for _ in self.ruleNames]
+        for productionID, (name, symbols, _) in enumerate(self.productions):
+            symbolsFirst, symbolsNullable = self.firstOf(symbols, first, nullable)
+            lookaheads = symbolsFirst | (follow[name] if symbolsNullable else set())
+            for lookahead in lookaheads:
+                previousID = table[name].get(lookahead)
+                table[name][lookahead] = productionID if previousID is None else self.resolveConflict(name, lookahead, previousID, productionID)
+
+        return {
+            "rules"       : self.ruleNames,
+            "productions" : self.productions,
+            "table"       : table,
+        }
+
+    def firstOf(self, symbols, first, nullable):
+        symbolsFirst = set()
+        for symbol in symbols:
+            if not self.isRule(symbol):
+                symbolsFirst.add(symbol)
+                return symbolsFirst, False
+            symbolsFirst |= first[symbol]
+            if symbol not in nullable: return symbolsFirst, False
+        return symbolsFirst, True
+
+    def resolveConflict(self, name, lookahead, previousID, productionID): #Only optional and repeated parts may clash, the longest match wins like the classic dangling ELSE
+        emptyIDs = [ID for ID in (previousID, productionID) if not self.productions[ID][1]]
+        if len(emptyIDs) != 1: raise Exception(f"Grammar is not LL(1): rule \"{self.ruleNames[name].split('#')[0]}\" is ambiguous on \"{lookahead}\".")
+        return productionID if emptyIDs[0] == previousID else previousID
+
+def loadTables(grammarFile = GRAMMAR_FILE):
+    with open(grammarFile) as fd: grammarText = fd.read()
+    grammarHash = zlib.crc32(f"{GENERATOR_VERSION}\n{grammarText}".encode()) #Only tells grammar versions apart, so a checksum is enough and spares importing hashlib at startup
+    cacheFile = os.path.join(CACHE_DIR, f"grammar.{grammarHash:08x}.marshal")
+    try:
+        with open(cacheFile, "rb") as fd: return marshal.load(fd)
+    except (OSError, ValueError, EOFError, TypeError): pass
+
+    tables = GrammarCompiler(grammarText).compile()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok = True)
+        tempFile = f"{cacheFile}.{os.getpid()}"
+        with open(tempFile, "wb") as fd: marshal.dump(tables, fd)
+        os.replace(tempFile, cacheFile)
+    except OSError: pass #A read-only install just regenerates the tables every time
+    return tables
+
+parseTable = None #Every rule name maps the lookahead keys to (symbols to push, actions to reduce, consumesToken, rule name), built from the tables on first use
+
+def getParseTable():
+    global parseTable
+    if parseTable is not None: return parseTable
+    tables = loadTables()
+    rows = [{} for _ in tables["rules"]]
+    for ruleID, row in enumerate(tables["table"]):
+        for lookahead in row: rows[ruleID][lookahead] = predict(tables, rows, ruleID, lookahead)
+    parseTable = dict(zip(tables["rules"], rows))
+    return parseTable
+
+def predict(tables, rows, ruleID, lookahead): #Expands the leftmost rules right away, so one lookup pushes a whole chain of productions and eats its first token
+    ruleName = tables["rules"][ruleID]
+    _, symbols, isAction = tables["productions"][tables["table"][ruleID][lookahead]]
+    action = getattr(TableParser, ruleName, None) if isAction else None #Rules without a method, like Instruction, pass their value through
+    push = [] if action is None else [action]
+    push += [rows[symbol] if type(symbol) is int else symbol for symbol in reversed(symbols[1:])] #Rules are swapped with their rows, so the parse loop tells them from terminal keys by type
+    actionCount, consumesToken = len(push) - len(symbols[1:]), False
+    if symbols and type(symbols[0]) is int:
+        firstPush, firstActions, consumesToken, _ = predict(tables, rows, symbols[0], lookahead)
+        push += firstPush
+        actionCount += firstActions
+    elif symbols: consumesToken = True
+    return push, actionCount, consumesToken, ruleName
+
+scanPattern = re.compile("|".join(f"({regexp[1:]})" for regexp, _ in tokenPatterns)) #One pass over the tokenizer patterns, alternatives are tried in order just like its loop
+scanGroups, groupID = {}, 1 #Group number of every pattern in scanPattern and its token type
+for regexp, tokenType in tokenPatterns:
+    scanGroups[groupID] = tokenType
+    groupID += re.compile(regexp).groups + 1
+
+def scanTokens(fileContent): #Yields (table key, value) pairs matching in place instead of slicing the source for every token
+    cursor, end = 0, len(fileContent)
+    match = scanPattern.match
+    while cursor < end:
+        _match = match(fileContent, cursor)
+        if _match is None: raise Exception(f"The tokenizer found unmatchable text: \"{fileContent[cursor:]}\", this is a bug and should be reported.")
+        cursor = _match.end()
+        tokenType = scanGroups[_match.lastindex]
+        if tokenType is None: continue
+
+        value = _match.group()
+        if tokenType == "KEYWORD": yield value, value
+        elif tokenType == "message": yield tokenType, value[1:-1]
+        else: yield tokenType, value
+
+def streamWindows(fd, chunkSize = STREAM_CHUNK): #Yields the file in chunks cut after their last line end, no token spans over one so scanTokens never sees half of a token
+    rest = ""
+    for chunk in iter(partial(fd.read, chunkSize), ""):
+        lineEnd = chunk.rfind("\n") + 1
+        if not lineEnd:
+            rest += chunk
+            continue
+        yield rest + chunk[:lineEnd]
+        rest = chunk[lineEnd:]
+    if rest: yield rest
+
+def streamTokens(fd, chunkSize = STREAM_CHUNK): #scanTokens over a sliding window of the file, at most a chunk and the line it cuts are held at once
+    for window in streamWindows(fd, chunkSize): yield from scanTokens(window)
+
+def streamHash(fd, chunkSize = STREAM_CHUNK): #contentHash of the whole file read one chunk at a time, leaves fd at its start
+    import hashlib
+    fileHash = hashlib.sha256()
+    for chunk in iter(partial(fd.read, chunkSize), ""): fileHash.update(chunk.encode())
+    fd.seek(0)
+    return fileHash.hexdigest()
+
+def rejectRange(value):
+    if value["type"] == "Operation" and value["operand"] == "TO": raise Exception("Range operation (OpToken \"TO\" OpToken) is only allowed within \"FOR-INSTR\" instruction AssignToken.")
+    return value
+
+def statement(value): #Only FOR assignments may hold a range, the ones written as statements are checked by the Lines/Block holding them
+    if value["type"] == "Assignment": rejectRange(value["value"])
+    return value
+
+def joinSubscripts(values): #Variable is transparent, so the list a Subscript reduces to follows its WORD among the values of the rule using it
+    joined = []
+    for value in values:
+        if type(value) is list: joined[-1] = (joined[-1], value[0] if value else None)
+        else: joined.append(value)
+    return joined
+
+def identifier(value): #The tokenizer keeps NUMBERs as text, WORDs never start with a digit or "-"
+    if type(value) is tuple: return arrayIdentifier(*value)
+    isVar = not (value[0].isdigit() or value[0] == "-")
+    if not isVar: value = float(value) if "." in value else int(value)
+    return {
+        "type"  : "Identifier",
+        "isVar" : isVar,
+        "value" : value,
+    }
+
+def arrayIdentifier(name, index): #"data[i]" reads an element, "data[]" the length of the array
+    token = {
+        "type"  : "Identifier",
+        "isVar" : True,
+        "value" : name,
+    }
+    if index is None: token["length"] = True
+    else: token["index"] = identifier(index)
+    return token
+
+class TableParser(ModuleParser): #Same interface and AST as Parser, but driven by the tables generated from grammar.txt instead of recursive calls
+    def __init__(self, fileContent, moduleName = "<main>", includeStack = (), directory = MODULES_DIRECTORY):
+        super().__init__(moduleName, includeStack, directory)
+        self.fileContent = fileContent
+        self.nextToken = partial(next, scanTokens(fileContent), None)
+
+    def parse(self, doPrint = False):
+        self.lookahead = self.nextToken()
+        program = self.parseRule("Program")
+        if self.lookahead is not None: raise Exception(f"Trailing content ({self.lookahead[1]}) was detected outside of main program.")
+        if doPrint: printNode(program)
+        return program
+
+    def parseRule(self, ruleName):
+        nextToken = self.nextToken
+        lookahead = self.lookahead
+        key = END if lookahead is None else lookahead[0]
+        stack = [getParseTable()[ruleName]]
+        values = []
+        heights = [] #Length of values when each pending action was pushed, the values above it are its children
+        pop, push, append = stack.pop, stack.extend, values.append
+        while stack:
+            top = pop()
+            topType = type(top)
+            if topType is dict:
+                production = top.get(key)
+                if production is None: raise Exception(f"Unexpected \"{key}\" in {next(iter(top.values()))[3].split('#')[0]}, expected one of: {', '.join(sorted(top))}")
+                symbols, actionCount, consumesToken, _ = production
+                if actionCount == 1: heights.append(len(values))
+                elif actionCount: heights += [len(values)] * actionCount
+                push(symbols)
+                if not consumesToken: continue
+            elif topType is str:
+                if top != key: raise Exception(f"Expected \"{top}\" but got \"{key}\"")
+            else:
+                height = heights.pop()
+                value = top(self, values[height:])
+                del values[height:]
+                append(value)
+                continue
+
+            append(lookahead[1])
+            lookahead = nextToken()
+            key = END if lookahead is None else lookahead[0]
+        self.lookahead = lookahead
+        return values[0]
+
+    def Program(self, values):
+        return {
+            "type"  : "Program",
+            "value" : values[0],
+        }
+
+    def Lines(self, values): #Also glues ELSE/UNTIL lines to the IF/REPEAT above them and splices INCLUDEd lines in
+        lines = []
+        prevExpr = None
+        afterNewline = True
+        for value in values:
+            if type(value) is str:
+                afterNewline = True
+                continue
+            if not afterNewline: raise Exception(f"Expected \"newline\" but got \"{value['type']}\"")
+            afterNewline = False
+            if value["type"] != "UNTIL-INSTR": requireUntil(prevExpr)
+
+            if value["type"] == "ELSE-INSTR":
+                if prevExpr is not None and prevExpr["type"] == "IF-INSTR": prevExpr["else"] = value["block"]
+                else: raise Exception("Unexpected \"ELSE\"")
+            elif value["type"] == "UNTIL-INSTR":
+                if prevExpr is not None and prevExpr["type"] == "REPEAT-INSTR": prevExpr["cond"] = value["cond"]
+                else: raise Exception("Unexpected \"UNTIL\"")
+            elif value["type"] == "INCLUDE-INSTR": lines.extend(value["value"])
+            else: lines.append(statement(value))
+            prevExpr = value
+        requireUntil(prevExpr)
+        return lines
+
+    def Assignment(self, values):
+        if len(values) != 3: values = joinSubscripts(values)
+        token = {
+            "type"   : "Assignment",
+            "target" : values[0],
+            "value"  : values[2],
+        }
+        if type(values[0]) is tuple:
+            token["target"], index = values[0]
+            if index is None: raise Exception(f"Cannot assign to \"{token['target']}[]\", assign to the whole array or to one of its elements.")
+            token["index"] = identifier(index)
+        return token
+
+    def Block(self, values):
+        if len(values) == 3: lines = values[1]
+        elif values[0]["type"] == "INCLUDE-INSTR": lines = values[0]["value"]
+        else:
+            requireUntil(values[0]) #The next line belongs to the Lines holding the Block, it can't be the UNTIL of this REPEAT
+            lines = [statement(values[0])]
+        return {
+            "type"  : "Block",
+            "value" : lines,
+        }
+
+    def List(self, values):
+        wordList, arrays = [], []
+        for word in joinSubscripts(values)[::2]:
+            if type(word) is tuple:
+                if word[1] is not None: raise Exception(f"Cannot READ the single element \"{word[0]}[{word[1]}]\", READ the whole array as \"{word[0]}[]\".")
+                word = word[0]
+                arrays.append(word)
+            wordList.append(word)
+        token = {
+            "type"  : "list",
+            "value" : wordList[0] if len(wordList) == 1 else wordList,
+        }
+        if arrays: token["arrays"] = arrays
+        return token
+
+    def WRITE(self, values):
+        value = values[1]
+        if type(value) is str:
+            value = {
+                "type"  : "Identifier",
+                "isVar" : False,
+                "value" : value,
+            }
+        return {
+            "type"  : "WRITE-INSTR",
+            "value" : rejectRange(value),
+        }
+
+    def READ(self, values):
+        token = {
+            "type"  : "READ-INSTR",
+            "value" : values[1]["value"],
+        }
+        if "arrays" in values[1]: token["arrays"] = values[1]["arrays"]
+        return token
+
+    def IF(self, values):
+        token = {
+            "type"  : "IF-INSTR",
+            "cond"  : values[1],
+            "block" : values[3],
+        }
+        if len(values) == 5: token["else"] = values[4]["block"]
+        return token
+
+    def ELSE(self, values):
+        return {
+            "type"  : "ELSE-INSTR",
+            "block" : values[1],
+        }
+
+    def FOR(self, values):
+        if "index" in values[1]: raise Exception("FOR-INSTR loop variable can't be an array element.")
+        return {
+            "type"  : "FOR-INSTR",
+            "iters" : values[1],
+            "block" : values[3],
+        }
+
+    def WHILE(self, values):
+        return {
+            "type"  : "WHILE-INSTR",
+            "cond"  : values[1],
+            "block" : values[3],
+        }
+
+    def REPEAT(self, values):
+        token = {
+            "type"  : "REPEAT-INSTR",
+            "block" : values[1],
+        }
+        if len(values) == 3: token["cond"] = values[2]["cond"]
+        return token
+
+    def UNTIL(self, values):
+        return {
+            "type" : "UNTIL-INSTR",
+            "cond" : values[1],
+        }
+
+    def INCLUDE(self, values):
+        return {
+            "type"  : "INCLUDE-INSTR",
+            "value" : includeModule(values[1], self.includeStack, TableParser, self.includedHashes, self.directory),
+        }
+
+    def Operation(self, values): #Identifier has no action of its own, its WORD or NUMBER text is turned into a node here
+        if len(values) not in (1, 3): values = joinSubscripts(values)
+        if len(values) == 1: return identifier(values[0])
+        return {
+            "type"    : "Operation",
+            "op1"     : identifier(values[0]),
+            "operand" : values[1],
+            "op2"     : identifier(values[2]),
+        }
+
+    def Subscript(self, values):
+        return values[1:-1]
+
+    def Condition(self, values):
+        return {
+            "type"    : "Condition",
+            "cp1"     : rejectRange(values[0]),
+            "operand" : values[1],
+            "cp2"     : rejectRange(values[2]),
+        }
+
+class StreamParser(TableParser): #Reads the file through streamTokens and yields its top-level statements one at a time, so neither the source nor its whole AST is ever held
+    def __init__(self, fd, moduleName = "<main>"):
+        ModuleParser.__init__(self, moduleName, (), os.path.dirname(os.path.abspath(fd.name)))
+        self.fileName = fd.name
+        self.nextToken = partial(next, streamTokens(fd), None)
+
+    def sourceHash(self): #Reads the file on its own, fd is somewhere in the middle of it by then
+        with open(self.fileName) as fd: return streamHash(fd)
+
+    def parse(self, doPrint = False): raise Exception("Streamed programs are parsed one statement at a time, iterate over StreamParser.statements() instead.")
+
+    def skipNewlines(self):
+        while self.lookahead is not None and self.lookahead[0] == "newline": self.lookahead = self.nextToken()
+        return self.lookahead
+
+    def parseLine(self): #Parses a statement that must end its line, failing with the same errors as Lines and Program would
+        value = self.parseStatement()
+        if self.lookahead is not None and self.lookahead[0] != "newline": raise Exception(f"Expected \"newline\" but got \"{self.parseStatement()['type']}\"")
+        return value
+
+    def parseStatement(self):
+        if self.lookahead[0] == "closeBlock": raise Exception(f"Trailing content ({self.lookahead[1]}) was detected outside of main program.")
+        return self.parseRule("Statement")
+
+    def statements(self): #An IF or REPEAT is only complete once the next line is known not to be its ELSE or UNTIL, peeking at its first token is enough
+        self.lookahead = self.nextToken()
+        while self.skipNewlines() is not None:
+            value = self.parseLine()
+            if value["type"] == "ELSE-INSTR": raise Exception("Unexpected \"ELSE\"")
+            if value["type"] == "UNTIL-INSTR": raise Exception("Unexpected \"UNTIL\"")
+            if value["type"] == "INCLUDE-INSTR":
+                yield from value["value"]
+                continue
+
+            if value["type"] in ("IF-INSTR", "REPEAT-INSTR") and self.skipNewlines() is not None:
+                if value["type"] == "IF-INSTR" and self.lookahead[0] == "ELSE": value["else"] = self.parseLine()["block"]
+                elif value["type"] == "REPEAT-INSTR" and self.lookahead[0] == "UNTIL": value["cond"] = self.parseLine()["cond"]
+            requireUntil(value)
+            yield statement(value)
@@ -0,0 +1,182 @@
+#Cross-backend harness: runs every .sudo program of a corpus through the interpreter and the transpiled py/c/cpp outputs, compares what they print and times them.
+#Input vectors for "<name>.sudo" are read from "<name>.inputs" next to it, one vector per line with the values separated by spaces. Programs that READ without one are skipped, every run would wait for input.
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from grammar import TableParser
+from interpreter import Interpreter
+
+INTERP_RUNNER = "import os, sys; from interpreter import Interpreter; interpreter = Interpreter(open(sys.argv[1]).read(), directory = os.path.dirname(os.path.abspath(sys.argv[1]))); interpreter.build(); interpreter.run()"
+COMPILERS = {
+    "c"   : "gcc",
+    "cpp" : "g++",
+}
+NOISE = [
+    re.compile(r"Program requested (value for variable|file for array) \"[^\"]*\": "),
+    re.compile(r"^(Build complete\.|Execution terminated successfully\.)$", re.MULTILINE),
+]
+
+def loadCorpus(corpusDir):
+    programs = []
+    for fileName in sorted(os.listdir(corpusDir)):
+        if not fileName.endswith(".sudo"): continue
+        name = fileName[:-len(".sudo")]
+        path = os.path.join(corpusDir, fileName)
+        vectors = [""]
+        inputsFile = os.path.join(corpusDir, f"{name}.inputs")
+        if os.path.exists(inputsFile):
+            with open(inputsFile) as fd: vectors = [line.strip() for line in fd if line.strip()] or [""]
+        elif readsInput(path): vectors = None
+        programs.append((name, path, vectors))
+    return programs
+
+def readsInput(path): #Whether the program READs, INCLUDEd modules too, programs that don't parse are left to their runs to report
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): program = TableParser(open(path).read(), directory = os.path.dirname(os.path.abspath(path))).parse()
+    except Exception: return False
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if type(node) is list: stack.extend(node)
+        elif type(node) is dict:
+            if node.get("type") == "READ-INSTR": return True
+            stack.extend(node.values())
+    return False
+
+def normalize(output):
+    for pattern in NOISE: output = pattern.sub("", output)
+    values = []
+    for word in output.split():
+        try: values.append(float(word))
+        except ValueError: values.append(word)
+    return values
+
+def sameOutput(expected, got):
+    if len(expected) != len(got): return False
+    for a, b in zip(expected, got):
+        if type(a) is float and type(b) is float:
+            if not math.isclose(a, b, rel_tol = 1e-6, abs_tol = 1e-9): return False
+        elif a != b: return False
+    return True
+
+def execute(command, vector, timeout):
+    stdin = "".join(f"{value}\n" for value in vector.split())
+    start = time.perf_counter()
+    try: result = subprocess.run(command, input = stdin, capture_output = True, text = True, timeout = timeout, cwd = os.path.dirname(os.path.abspath(__file__)))
+    except subprocess.TimeoutExpired: return "timeout", None, time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0: return "runtime error", None, elapsed
+    return "ok", result.stdout, elapsed
+
+def transpile(path, lang, cse):
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = Interpreter(open(path).read(), toggle_cse = cse, directory = os.path.dirname(os.path.abspath(path)))
+        interpreter.build()
+        return interpreter.transpileText(lang)
+
+def prepareBackend(path, lang, workDir, cse):
+    try: source = transpile(path, lang, cse)
+    except Exception as error: return "transpile error", str(error)
+
+    sourceFile = os.path.join(workDir, f"{os.path.basename(path)[:-len('.sudo')]}.{lang}")
+    with open(sourceFile, "w") as fd: fd.write(source)
+    if lang == "py": return "ok", [sys.executable, sourceFile]
+
+    compiler = shutil.which(COMPILERS[lang])
+    if compiler is None: return "missing compiler", None
+    binary = f"{sourceFile}.out"
+    result = subprocess.run([compiler, "-O2", "-o", binary, sourceFile], capture_output = True, text = True)
+    if result.returncode != 0: return "compile error", result.stderr.strip().splitlines()[0] if result.stderr.strip() else None
+    return "ok", [binary]
+
+def runHarness(corpusDir, backends, timeout, baseline, slowdown, cse = False):
+    results = []
+    with tempfile.TemporaryDirectory() as workDir:
+        for name, path, vectors in loadCorpus(corpusDir):
+            if vectors is None:
+                results.append(makeResult(name, "", "all", "skipped", None, None, baseline, slowdown, f"READs input but there is no {name}.inputs"))
+                continue
+            commands = {"interp" : ("ok", [sys.executable, "-c", INTERP_RUNNER, os.path.abspath(path)])}
+            for lang in backends: commands[lang] = prepareBackend(path, lang, workDir, cse)
+
+            for vector in vectors:
+                status, output, elapsed = execute(commands["interp"][1], vector, timeout)
+                expected = normalize(output) if status == "ok" else None
+                interpTime = elapsed if status == "ok" else None
+                results.append(makeResult(name, vector, "interp", status, elapsed, interpTime, baseline, slowdown))
+
+                for lang in backends:
+                    status, detail = commands[lang]
+                    if status != "ok":
+                        results.append(makeResult(name, vector, lang, status, None, interpTime, baseline, slowdown, detail))
+                        continue
+                    status, output, elapsed = execute(detail, vector, timeout)
+                    if status == "ok" and expected is not None and not sameOutput(expected, normalize(output)): status = "divergence"
+                    results.append(makeResult(name, vector, lang, status, elapsed, interpTime, baseline, slowdown))
+    return results
+
+def makeResult(name, vector, backend, status, elapsed, interpTime, baseline, slowdown, detail = None):
+    result = {
+        "program" : name,
+        "inputs"  : vector,
+        "backend" : backend,
+        "status"  : status,
+        "time"    : elapsed,
+        "flags"   : [],
+    }
+    if detail: result["detail"] = detail
+    if status not in ("ok", "skipped"): result["flags"].append(status)
+    if elapsed is None or status != "ok": return result
+
+    if backend != "interp" and interpTime is not None and elapsed > interpTime: result["flags"].append("slower than interpreter")
+    previous = baseline.get(resultKey(result))
+    if previous is not None and elapsed > previous * slowdown: result["flags"].append(f"slowdown x{elapsed / previous:.2f} vs baseline")
+    return result
+
+def resultKey(result): return f"{result['program']}|{result['inputs']}|{result['backend']}"
+
+def printTable(results):
+    rows = [("program", "inputs", "backend", "status", "time (ms)", "flags")]
+    for result in results:
+        elapsed = "-" if result["time"] is None else f"{result['time'] * 1000:.1f}"
+        rows.append((result["program"], result["inputs"] or "-", result["backend"], result["status"], elapsed, ", ".join(result["flags"]) or result.get("detail", "")))
+    widths = [max(len(row[col]) for row in rows) for col in range(len(rows[0]))]
+    for row in rows: print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+def main():
+    argParser = argparse.ArgumentParser(description = "Compare interpreter and transpiled backends on a corpus of .sudo programs.")
+    argParser.add_argument("corpus", nargs = "?", default = "./FILES", help = "directory of .sudo programs and their .inputs files")
+    argParser.add_argument("--backends", default = "py,c,cpp", help = "comma separated transpile backends to check")
+    argParser.add_argument("--timeout", type = float, default = 10, help = "seconds allowed to every single run")
+    argParser.add_argument("--baseline", help = "results JSON of a previous run, to flag slowdowns against")
+    argParser.add_argument("--slowdown", type = float, default = 1.25, help = "runtime ratio over the baseline that is flagged")
+    argParser.add_argument("--cse", action = "store_true", help = "transpile with common-subexpression elimination, the interpreter runs without it as the reference")
+    argParser.add_argument("--save", help = "write the results as JSON to this file")
+    args = argParser.parse_args()
+
+    backends = [lang for lang in args.backends.split(",") if lang]
+    for lang in backends:
+        if lang not in ("py", *COMPILERS): raise Exception(f"Unsupported harness backend \"{lang}\", choose among py, c, cpp.")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as fd: baseline = {resultKey(result) : result["time"] for result in json.load(fd) if result["time"] is not None}
+
+    results = runHarness(args.corpus, backends, args.timeout, baseline, args.slowdown, args.cse)
+    printTable(results)
+    if args.save:
+        with open(args.save, "w") as fd: json.dump(results, fd, indent = 4)
+    if any(result["flags"] for result in results): sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
 # Module for handling simulation mode
-from Parser import Parser
+from parser import MODULES_DIRECTORY, Parser
+from grammar import TableParser, StreamParser
 import sys
 
 runtime_vars = {}
-tabID = 0
+lazyBuild = False
+metrics = None
+checkpointer = None
+resumeFrames = []  #Saved frames of a loaded checkpoint not reached yet, outermost last
+buildStack = []    #(Block, expressions) pairs whose lines are still to be built
+builtNodes = []    #Nodes holding Blocks in creation order, they choose their exec once everything below them is built
+INLINE_DEPTH = 32  #Nodes nesting at most this many Blocks run with plain calls, deeper ones go through runTree
 
 def Instruction(token):
     return {
@@ -15,138 +22,324 @@ def Instruction(token):
         "REPEAT-INSTR" : RepeatInstruction,
     }[token["type"]](token)
 
+def Line(token): return Assignment(token) if token["type"] == "Assignment" else Instruction(token)
+
+def lazyLine(expression, block): #Lines of LazyBlocks are built lazily too, whichever Interpreter set lazyBuild last
+    global lazyBuild
+    wasLazy, lazyBuild = lazyBuild, True
+    try: line = Line(expression)
+    finally: lazyBuild = wasLazy
+    if line.isCompound: line.holder = block
+    return line
+
+def settle(node): #Re-picks the execs of a lazily built Block and of the nodes holding it, up to the first one still compound. Nodes never turn compound again, the loops calling them directly rely on it
+    while node is not None and type(node) is not LazyBlock: #Blocks still building their lines settle once they are done
+        node.setExec()
+        if node.isCompound: return
+        node = node.holder
+
+def buildTree(token): #Builds the Blocks from an explicit stack instead of recursing, so the nesting depth is only bound by memory
+    global buildStack, builtNodes
+    buildStack, builtNodes = [], []
+    root = Block(token)
+    while buildStack:
+        block, expressions = buildStack.pop()
+        block.lines = [Line(expression) for expression in expressions]
+    for node in reversed(builtNodes): node.setExec() #Nodes are always created after the ones holding them
+    builtNodes = []
+    return root
+
+def runTree(root): #Compound execs are generators yielding the nodes to run next, so deeply nested Blocks don't grow the Python stack
+    steps = root.exec()
+    if steps is None: return
+    stack = [steps]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node = next(stack[-1], None)
+        if node is None: pop()
+        else:
+            steps = node.exec()
+            if steps is not None: push(steps)
+
+def loopExec(loop): #Loops run their Block with plain calls unless it's compound, then they yield it at every iteration
+    loop.__dict__.pop("exec", None)
+    loop.depth = loop.block.depth
+    if type(loop.block) is LazyBlock: loop.block.holder = loop
+    if checkpointer is not None:
+        if loop.block.isCompound: loop.exec = loop.execCheckpointedNested
+        elif loop.block.hasSteps: loop.exec = loop.execCheckpointed
+        else: loop.exec = loop.execCheckpointedInner
+    elif type(loop.block) is LazyBlock: loop.exec = loop.execLazy
+    elif loop.block.isCompound: loop.exec = loop.execNested
+    elif metrics is not None: loop.exec = loop.execMetered
+    loop.isCompound = loop.block.isCompound
+
 def distinguishIdOp(token): return Operation(token) if token["type"] == "Operation" else Identifier(token)
 
 def defineVariable(varName, value):
     runtime_vars[varName] = value
 
+def arrayValue(varName):
+    if varName not in runtime_vars: raise RuntimeError(f"Undefined variable \"{varName}\"")
+    array = runtime_vars[varName]
+    if not getattr(array, "ndim", 0): raise RuntimeError(f"Variable \"{varName}\" is not an array.")
+    return array
+
+def arrayIndex(varName, index): #Returns the array held by varName and index as a valid position in it
+    array = arrayValue(varName)
+    if index != int(index) or not 0 <= index < len(array): raise RuntimeError(f"Invalid index {index} for array \"{varName}\" of length {len(array)}.")
+    return array, int(index)
+
+def truthValue(result): #Comparisons involving array items give NumPy booleans, the ones of whole arrays give arrays of them
+    if getattr(result, "ndim", 0): raise RuntimeError("Cannot compare whole arrays, compare their elements instead.")
+    return bool(result)
+
+def writeValue(value): #Whole arrays are written as their elements separated by spaces, like the transpiled programs do
+    if getattr(value, "ndim", 0): print(*value)
+    else: print(value)
+
+def resumeFrame():
+    return resumeFrames.pop() if resumeFrames else None
+
+def checkpointReached(): #Steps are loop iterations and READ values, the only places a program can spend hours in. They count themselves inline and call this once checkpointer.nextCheck is reached
+    if not resumeFrames: checkpointer.check(runtime_vars, savedPosition)
+
+def checkpointDue(stepsLeft): #Innermost loops count their steps down in a local, returns how many are left once the check is done
+    checkpointer.steps = checkpointer.nextCheck - stepsLeft
+    checkpointReached()
+    return checkpointer.nextCheck - checkpointer.steps
+
+def savedPosition(): #Read from the frames of the checkpointed execs running, outermost first, so nothing tracks the position until a checkpoint is saved. CHECKPOINTED_LOCALS lists the locals read
+    frames, frame = [], sys._getframe(1)
+    while frame.f_code is not runTree.__code__:
+        if frame.f_code in CHECKPOINTED_EXECS: frames.append(frame)
+        frame = frame.f_back
+    suspended = [steps.gi_frame for steps in frame.f_locals.get("stack", ()) if not steps.gi_running] #Generators waiting in runTree for the nodes they yielded
+    return [frame.f_locals["self"].savedFrame(frame.f_locals) for frame in suspended + frames[::-1]]
+
 class Interpreter:
-    def __init__(self, fileContent, toggle_dbgMode = False):
+    def __init__(self, fileContent, toggle_dbgMode = False, toggle_lazyBuild = False, toggle_metrics = False, checkpointer = None, toggle_tableParser = True, toggle_cse = False, toggle_memory = False, directory = MODULES_DIRECTORY): #INCLUDEs are resolved from directory, the one of the source file when there's one
         self.dbgModeFlag = toggle_dbgMode
-        self.parser = Parser(fileContent)
+        self.lazyBuildFlag = toggle_lazyBuild
+        self.cseFlag = toggle_cse
+        if type(fileContent) is bytes: #Binary ASTs written by astdump, loaded instead of parsed
+            from astdump import ASTReader
+            self.parser = ASTReader(fileContent)
+        else: self.parser = (TableParser if toggle_tableParser else Parser)(fileContent, directory = directory)
+        if checkpointer is not None and not hasattr(sys, "_getframe"): raise Exception("Checkpoints read the position from the running frames, this Python implementation doesn't expose them.")
+        self.checkpointer = checkpointer
+        self.metrics = None
+        if toggle_metrics:
+            from metrics import Metrics
+            self.metrics = Metrics(trackMemory = toggle_memory)
+            if self.parser.nextToken is not None: self.parser.nextToken = self.metrics.meterTokens(self.parser.nextToken)
     
     def exec(self):
         self.build()
         self.run()
 
-    def parse(self):
-        return self.parser.parse(doPrint = self.dbgModeFlag)
+    def measure(self, phaseName, function, *args, **kwargs):
+        if self.metrics is None: return function(*args, **kwargs)
+        return self.metrics.measure(phaseName, function, *args, **kwargs)
 
-    def build(self):
-        self.AST = Block(self.parse())
-        print("Build complete.")
-
-    def run(self):
-        global runtime_vars
+    def parse(self):
+        program = self.measure("parse", self.parser.parse, doPrint = self.dbgModeFlag)
+        if self.metrics is not None:
+            from metrics import countNodes
+            self.metrics.count("nodes", countNodes(program))
+        return self.eliminateSubexpressions(program) if self.cseFlag else program
+
+    def eliminateSubexpressions(self, program): #Reports the reused values in the metrics and, in debug mode, on the standard output
+        from cse import eliminate
+        program, reused = self.measure("cse", eliminate, program)
+        eliminated = sum(value.reuses for value in reused)
+        if self.metrics is not None: self.metrics.count("cseEliminated", eliminated)
+        if self.dbgModeFlag and reused:
+            print(f"Common subexpressions: {eliminated} evaluations eliminated.")
+            for value in reused: print(f"\t{value.text()} reused {value.reuses} times")
+        return program
+
+    def setGlobals(self): #Nodes read the toggles from the module globals, every phase sets them again as another Interpreter may have used them since
+        global lazyBuild, metrics, checkpointer
+        lazyBuild = self.lazyBuildFlag
+        metrics = self.metrics
+        checkpointer = self.checkpointer
+
+    def build(self, doPrint = True):
+        self.setGlobals()
+        program = self.parse()
+        if checkpointer is not None: #Positions index the lines of the main file and of every module it INCLUDEs, rewritten ones when CSE is on
+            checkpointer.program = "+".join((self.parser.includeStack[-1][0], *self.parser.includedHashes)) + (":cse" if self.cseFlag else "")
+        self.AST = self.measure("build", buildTree, program)
+        if doPrint: print("Build complete.")
+
+    def run(self, resume_from = None):
+        global runtime_vars, resumeFrames
+        self.setGlobals()
         runtime_vars = {}
-        self.AST.exec()
+        resumeFrames = []
+        if checkpointer is not None: checkpointer.reset()
+        if resume_from is not None:
+            if checkpointer is None: raise Exception("Resuming a checkpoint requires an Interpreter built with a Checkpointer.")
+            from checkpoint import loadCheckpoint
+            snapshot = loadCheckpoint(resume_from, checkpointer.program)
+            runtime_vars = snapshot["variables"]
+            resumeFrames = snapshot["position"][::-1]
+            checkpointer.reset(snapshot["steps"] - 1) #Checkpoints are taken at the start of a step, which runs again once resumed
+        
+        self.measure("run", runTree, self.AST)
         print("Execution terminated successfully.")
         if self.dbgModeFlag: print(runtime_vars)
     
-    def transpile(self):
-        global runtime_vars, tabID
-        runtime_vars = {}
-        tabID = 0
-        languages = Token("").languages.keys()
-        while True:
+    def transpile(self, lang = None, fileName = None): #Asks for the language when none is given, the file goes next to the source by default
+        import backends
+        while lang is None:
             lang = input("Select language of choice: ")
-            if lang in languages: break
-            print("Language unavailable, your options are:\n\t%s\n\n" % '\n\t'.join(languages))
+            if lang in backends.LANGUAGES: break
+            print("Language unavailable, your options are:\n\t%s\n\n" % '\n\t'.join(backends.LANGUAGES))
+            lang = None
         
-        fileContent = self.AST.transpile(lang, isStart = True)
-        with open(f"./FILES/{sys.argv[1]}.{lang}", "w") as fd: fd.write(fileContent)
+        fileContent = self.transpileText(lang)
+        if fileName is None: fileName = f"./FILES/{sys.argv[1]}.{lang}"
+        with open(fileName, "w") as fd: fd.write(fileContent)
         print(f".{lang} file created successfully.")
 
+    def transpileText(self, lang): #Only the backend of lang gets imported
+        import backends
+        backend = backends.load(lang)
+        backends.reset()
+        self.setGlobals()
+        return self.measure("transpile", backend.transpileProgram, self.AST)
+
+class StreamInterpreter(Interpreter): #Parses, builds and runs one top-level statement at a time, its AST is dropped before the next one is read
+    def __init__(self, fileName, toggle_dbgMode = False, toggle_metrics = False, toggle_cse = False, toggle_memory = False):
+        self.fileName = fileName
+        self.dbgModeFlag = toggle_dbgMode
+        self.lazyBuildFlag = False
+        self.cseFlag = toggle_cse
+        self.checkpointer = None
+        self.metrics = None
+        if toggle_metrics:
+            from metrics import Metrics
+            self.metrics = Metrics(trackMemory = toggle_memory)
+
+    def exec(self): self.run()
+
+    def build(self): raise Exception("Streamed programs are built one statement at a time while they run.")
+
+    def run(self):
+        global runtime_vars, resumeFrames
+        self.setGlobals()
+        runtime_vars = {}
+        resumeFrames = []
+        if metrics is not None: from metrics import countNodes
+
+        with open(self.fileName) as fd:
+            self.parser = StreamParser(fd)
+            if metrics is not None: self.parser.nextToken = metrics.meterTokens(self.parser.nextToken)
+            statements = self.parser.statements()
+            while True:
+                line = self.measure("parse", next, statements, None)
+                if line is None: break
+                if metrics is not None: metrics.count("nodes", countNodes(line))
+                program = {"type" : "Program", "value" : [line]}
+                if self.cseFlag: program = self.eliminateSubexpressions(program) #Values are only reused within one top-level statement
+                self.measure("run", runTree, self.measure("build", buildTree, program))
+        print("Execution terminated successfully.")
+        if self.dbgModeFlag: print(runtime_vars)
+
+    def transpileText(self, lang): raise Exception("Streamed programs can't be transpiled, their AST is never held whole.")
+
 class Token:
     def __init__(self, token):
+        if self.isCompound and not lazyBuild: builtNodes.append(self)
         self.argumentize(token)
-        self.languages = {
-            "js"  : self.transpileJs,
-            "py"  : self.transpilePy,
-            "c"   : self.transpileC,
-            "cpp" : self.transpileCpp,
-            "gl"  : self.transpileGl,
-        }
+        if self.isCompound and lazyBuild: self.setExec() #Lazy Blocks can't look at their lines, so nothing waits for them
     
+    hasSteps = False #Whether checkpoints can be taken while this runs, only such nodes run their checkpointed execs
+    isCompound = False #Whether exec may return a generator of nodes for runTree, nodes holding Blocks settle it in setExec
+    holder = None      #Node holding this one while it may stop being compound, only set by lazy builds
+    depth = 0          #How many Blocks are nested within this node
+
     def argumentize(self, token):
         pass
 
     def exec(self):
         pass
 
-    def transpile(self, lang, isStart = False): return self.languages[lang](isStart)
-
-    def transpileJs(self): return ["(() => {\n", "\n})();"]
-    
-    def transpilePy(self): return ["def main():\n", "\n\nif __name__ == '__main__': main()"]
-
-    def transpileC(self): return ["#include<stdio.h>\n#include<cstdlib>\n\nint main() {\n", "\n}"]
-
-    def transpileCpp(self): return ["#include<iostream>\n#include<cstdlib>\n\nusing namespace std;\n\nint main() {\n", "\n}"]
+class Block(Token):
+    isCompound = True
 
-    def transpileGl(self): return "use std = \"std GLib\"\n\n"
+    def __new__(cls, token): #Lazy builds get LazyBlocks, the eager ones never pay for their __getattr__
+        return super().__new__(LazyBlock if lazyBuild and cls is Block else cls)
 
-class Block(Token):
     def argumentize(self, token):
-        self.lines = [Assignment(expression) if expression["type"] == "Assignment" else Instruction(expression) for expression in token["value"]]
+        self.lines = []
+        buildStack.append((self, token["value"]))
+
+    def setExec(self):
+        self.__dict__.pop("exec", None)
+        self.hasSteps = checkpointer is not None and any(line.hasSteps for line in self.lines)
+        self.depth = 1 + max((line.depth for line in self.lines), default = 0)
+        self.isCompound = self.depth > INLINE_DEPTH or any(line.isCompound for line in self.lines)
+        if self.hasSteps: self.exec = self.execCheckpointedNested if self.isCompound else self.execCheckpointed
+        elif self.isCompound: self.exec = self.execNested
 
     def exec(self):
         for line in self.lines: line.exec()
 
-    def transpileJs(self, isStart = False):
-        if isStart: boilerplate = super().transpileJs()
-        global tabID
-        tabID += 1
-        indent = tabID * "\t"
-        text = indent + (";\n%s" % indent).join([line.transpileJs() for line in self.lines])
-        if len(text.lstrip()) and text[-1] != "}": text += ";"
-        tabID -= 1
-        return f"{boilerplate[0]}{text}{boilerplate[1]}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
-    
-    def transpilePy(self, isStart = False):
-        if isStart: boilerplate = super().transpilePy()
-        global tabID
-        tabID += 1
-        indent = tabID * "\t"
-        text = indent + ("\n%s" % indent).join([line.transpilePy() for line in self.lines])
-        tabID -= 1
-        return f"{boilerplate[0]}{text}{boilerplate[1]}" if isStart else ("\n%s" % text)
-    
-    def transpileC(self, isStart = False):
-        if isStart: boilerplate = super().transpileC()
-        global tabID
-        tabID += 1
-        indent = tabID * "\t"
-        text = indent + (";\n%s" % indent).join([line.transpileC() for line in self.lines])
-        if len(text.lstrip()) and text[-1] != "}": text += ";"
-        tabID -= 1
-        return f"{boilerplate[0]}{text}{boilerplate[1]}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
-    
-    def transpileCpp(self, isStart = False):
-        if isStart: boilerplate = super().transpileCpp()
-        global tabID
-        tabID += 1
-        indent = tabID * "\t"
-        text = indent + (";\n%s" % indent).join([line.transpileCpp() for line in self.lines])
-        if len(text.lstrip()) and text[-1] != "}": text += ";"
-        tabID -= 1
-        return f"{boilerplate[0]}{text}{boilerplate[1]}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
-    
-    def transpileGl(self, isStart = False):
-        global tabID
-        if isStart:
-            boilerplate = super().transpileGl()
-            tabID -= 1
-        tabID += 1
-        indent = tabID * "\t"
-        text = indent + ("\n%s" % indent).join([line.transpileGl() for line in self.lines])
-        tabID -= 1
-        return f"{boilerplate}{text}" if isStart else ("{\n%s\n%s}" % (text, indent[1:]))
+    def execNested(self):
+        for line in self.lines:
+            if line.isCompound: yield line
+            else: line.exec()
+
+    def execCheckpointed(self): #A resumed Block starts from the line that was running
+        for line in self.lines[resumeFrames.pop()[0]:] if resumeFrames else self.lines: line.exec()
+
+    def execCheckpointedNested(self):
+        for line in self.lines[resumeFrames.pop()[0]:] if resumeFrames else self.lines:
+            if line.isCompound: yield line
+            else: line.exec()
+
+    def savedFrame(self, frameLocals): return [self.lines.index(frameLocals["line"])]
+
+class LazyBlock(Block): #Keeps its expressions until the first exec or transpile needs the lines, then turns into a plain Block
+    def argumentize(self, token):
+        self.rawLines = token["value"]
+
+    def setExec(self): #Lazy Blocks can't look at their lines, checkpointed ones build them all when they first run
+        self.hasSteps = checkpointer is not None
+        self.exec = self.execCheckpointedNested if self.hasSteps else self.execLazy
+
+    def __getattr__(self, name): #Only reached while the lines haven't been needed yet
+        if name != "lines" or "rawLines" not in self.__dict__: raise AttributeError(name)
+        self.setLines([lazyLine(expression, self) for expression in self.__dict__.pop("rawLines")])
+        return self.lines
+
+    def setLines(self, lines): #Ends the lazy build, from then on the Block and the nodes holding it run like built ones
+        self.lines = lines
+        wasLazy = self.exec == self.execLazy
+        self.__class__ = Block
+        if wasLazy: settle(self)
+
+    def execLazy(self): #Builds each line right before its first run, so the first instruction doesn't wait for the whole Block
+        lines = []
+        for expression in self.rawLines:
+            line = lazyLine(expression, self)
+            lines.append(line)
+            if line.isCompound: yield line
+            else: line.exec()
+        del self.rawLines
+        self.setLines(lines)
 
 class Assignment(Token):
     def argumentize(self, token):
         self.target = token["target"]
         self.value = distinguishIdOp(token["value"])
+        self.index = None
+        if "index" in token:
+            self.index = Identifier(token["index"])
+            self.exec = self.execItem
     
     def exec(self):
         value = self.value.exec()
@@ -155,239 +348,144 @@ class Assignment(Token):
             value = value[1]
         else: defineVariable(self.target, value)
         return value
-    
-    def transpileJs(self):
-        target = ""
-        if self.target not in runtime_vars:
-            target = "var "
-            runtime_vars[self.target] = "defined"
-        value = self.value.transpileJs()
-        target += f"{self.target} = "
-        if type(value) is tuple:
-            target += value[0]
-            return target, value
-        
-        return f"{target}{value}"
-    
-    def transpilePy(self):
-        value = self.value.transpilePy()
-        target = f"{self.target} = "
-        if type(value) is tuple:
-            target += value[0]
-            return target, value
-        
-        return f"{target}{value}"
-    
-    def transpileC(self):
-        target = ""
-        if self.target not in runtime_vars:
-            target = "float "
-            runtime_vars[self.target] = "defined"
-        value = self.value.transpileC()
-        target += f"{self.target} = "
-        if type(value) is tuple:
-            target += value[0]
-            return target, value
-        
-        return f"{target}{value}"
-    
-    def transpileCpp(self):
-        target = ""
-        if self.target not in runtime_vars:
-            target = "float "
-            runtime_vars[self.target] = "defined"
-        value = self.value.transpileCpp()
-        target += f"{self.target} = "
-        if type(value) is tuple:
-            target += value[0]
-            return target, value
-        
-        return f"{target}{value}"
-    
-    def transpileGl(self):
-        target = ""
-        if self.target not in runtime_vars:
-            target = "make "
-            runtime_vars[self.target] = "defined"
-        value = self.value.transpileGl()
-        target += f"{self.target} = "
-        if type(value) is tuple:
-            target += value[0]
-            return target, value
-        
-        return f"{target}{value}"
+
+    def execItem(self):
+        value = self.value.exec()
+        array, index = arrayIndex(self.target, self.index.exec())
+        array[index] = value
+        return value
 
 class WriteInstruction(Token):
     def argumentize(self, token):
         self.value = distinguishIdOp(token["value"])
+        if metrics is not None: self.exec = self.execMetered
     
     def exec(self):
-        print(self.value.exec())
+        writeValue(self.value.exec())
 
-    def transpileJs(self):
-        return f"console.log({self.value.transpileJs()})"
-    
-    def transpilePy(self):
-        return f"print({self.value.transpilePy()})"
-    
-    def transpileC(self):
-        return f"printf(\"%f\", {self.value.transpileC()})"
-    
-    def transpileCpp(self):
-        return f"cout << {self.value.transpileCpp()} << endl"
-    
-    def transpileGl(self):
-        return f"print {self.value.transpileGl()}"
+    def execMetered(self):
+        metrics.counters["writes"] += 1
+        writeValue(self.value.exec())
 
 class ReadInstruction(Token):
+    hasSteps = True
+
     def argumentize(self, token):
         value = token["value"]
-        if type(value) is str:
-            self.value = [value]
-            return
-        
-        self.value = value.copy()
+        if type(value) is str: self.value = [value]
+        else: self.value = value.copy()
         if len(self.value) != len(set(self.value)): raise Exception(f"List of input values \"{', '.join(self.value)}\" contains duplicate names.")
+        self.arrays = set(token.get("arrays", ()))
+        if self.arrays and checkpointer is not None: raise Exception(f"Programs READing arrays can't be checkpointed, snapshots can't hold \"{sorted(self.arrays)[0]}[]\".")
+        if checkpointer is not None: self.exec = self.execCheckpointed
+        elif metrics is not None: self.exec = self.execMetered
     
     def exec(self):
-        for name in self.value:
-            value = input(f"Program requested value for variable \"{name}\": ")
-            try: value = float(value) if "." in value else int(value)
-            except ValueError: raise RuntimeError("Cannot input non-numeric value for variables.") from None
-            defineVariable(name, value)
-
-    def transpileJs(self):
-        values = []
-        for name in self.value:
-            values.append("")
-            if name not in runtime_vars:
-                values[-1] += "var "
-                runtime_vars[name] = "defined"
-            values[-1] += f"{name} = prompt('Program requested value for variable \"{name}\": ')"
-        return (";\n" + "\t" * tabID).join(values)
-    
-    def transpilePy(self):
-        values = []
-        for name in self.value: values.append(f"{name} = float(input('Program requested value for variable \"{name}\": '))")
-        return ("\n" + "\t" * tabID).join(values)
-    
-    def transpileC(self):
-        values = []
-        indent = tabID * "\t"
-        for name in self.value:
-            values.append("")
-            if name not in runtime_vars:
-                values[-1] += "float "
-                runtime_vars[name] = "defined"
-            values[-1] += f"{name};\n{indent}scanf(\"%f\", &{name})"
-        return (";\n" + indent).join(values)
-    
-    def transpileCpp(self):
-        values = []
-        indent = tabID * "\t"
-        for name in self.value:
-            values.append("")
-            if name not in runtime_vars:
-                values[-1] += "float "
-                runtime_vars[name] = "defined"
-            values[-1] += f"{name};\n{indent}cin >> {name}"
-        return (";\n" + indent).join(values)
-    
-    def transpileGl(self):
-        values = []
-        indent = tabID * "\t"
-        for name in self.value:
-            values.append("")
-            if name not in runtime_vars:
-                values[-1] += "make "
-                runtime_vars[name] = "defined"
-            values[-1] += f"{name} :num = inp"
-        return ("\n" + indent).join(values)
+        for name in self.value: self.readValue(name)
+
+    def execMetered(self):
+        ReadInstruction.exec(self)
+        metrics.counters["reads"] += len(self.value)
+
+    def execCheckpointed(self): #The saved frame counts the values already read, so a checkpoint taken halfway only asks for the missing ones
+        start, = resumeFrame() or (0,)
+        for valueID in range(start, len(self.value)):
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            self.readValue(self.value[valueID])
+            if metrics is not None: metrics.counters["reads"] += 1
+
+    def savedFrame(self, frameLocals): return [frameLocals["valueID"]]
+
+    def readValue(self, name):
+        if name in self.arrays: return self.readArray(name)
+        value = input(f"Program requested value for variable \"{name}\": ")
+        try: value = float(value) if "." in value else int(value)
+        except ValueError: raise RuntimeError("Cannot input non-numeric value for variables.") from None
+        defineVariable(name, value)
+
+    def readArray(self, name):
+        from arrays import loadArray
+        defineVariable(name, loadArray(input(f"Program requested file for array \"{name}\": ")))
 
 class ForInstruction(Token):
+    hasSteps = True
+    isCompound = True
+
     def argumentize(self, token):
         self.assignment = Assignment(token["iters"])
         self.block = Block(token["block"])
 
-    def exec(self):
+    def setExec(self):
+        loopExec(self)
+
+    def iterations(self):
         iters = self.assignment.exec()
         if iters < 0: raise RuntimeError(f"Cannot loop a negative number ({iters}) of times.")
         if type(iters) is not int: raise RuntimeError(f"Cannot loop a non-integer number ({iters}) of times.")
-        for i in range(iters): self.block.exec()
-
-    def transpileJs(self):
-        iterator = self.assignment.transpileJs()
-        if type(iterator) is tuple:
-            fromValue, toValue = iterator[1]
-            iterator = iterator[0]
-        else:
-            fromValue = 0
-            toValue = iterator[iterator.find("=") + 2:]
-
-        return f"{iterator};\n" + "\t" * tabID + f"for(let _ = {fromValue}; _ < {toValue}; _++) {self.block.transpileJs()}"
+        return iters
 
-    def transpilePy(self):
-        iters = self.assignment.transpilePy()
-        if type(iters) is tuple:
-            iterLen = f"{iters[1][0]}, {iters[1][1]}"
-            iters = iters[0]
-        else: iterLen = iters[iters.find("=") + 2:]
-
-        return "%s\n%sfor _ in range(%s):%s" % (iters, '\t' * tabID, iterLen, self.block.transpilePy())
-    
-    def transpileC(self):
-        iterator = self.assignment.transpileC()
-        if type(iterator) is tuple:
-            fromValue, toValue = iterator[1]
-            iterator = iterator[0]
-        else:
-            fromValue = 0
-            toValue = iterator[iterator.find("=") + 2:]
-
-        return f"{iterator};\n" + "\t" * tabID + f"for(int _ = {fromValue}; _ < {toValue}; _++) {self.block.transpileC()}"
+    def exec(self):
+        for i in range(self.iterations()): self.block.exec()
 
-    def transpileCpp(self):
-        iterator = self.assignment.transpileCpp()
-        if type(iterator) is tuple:
-            fromValue, toValue = iterator[1]
-            iterator = iterator[0]
-        else:
-            fromValue = 0
-            toValue = iterator[iterator.find("=") + 2:]
+    def execMetered(self):
+        for i in range(self.iterations()):
+            metrics.counters["loopIterations"] += 1
+            self.block.exec()
 
-        return f"{iterator};\n" + "\t" * tabID + f"for(int _ = {fromValue}; _ < {toValue}; _++) {self.block.transpileCpp()}"
-    
-    def transpileGl(self):
-        iterator = self.assignment.transpileGl()
-        if type(iterator) is tuple:
-            fromValue, toValue = iterator[1]
-            toValue += f" {fromValue} -"
-            iterator = iterator[0]
-        else:
-            fromValue = 0
-            toValue = iterator[iterator.find("=") + 2:]
+    def execNested(self):
+        for i in range(self.iterations()):
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield self.block
+
+    def execLazy(self): #Yields the Block until running it built it, the remaining iterations call it directly unless it's still compound
+        block = self.block
+        iterations = iter(range(self.iterations()))
+        for i in iterations:
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield block
+            if not block.isCompound: break
+        for i in iterations:
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            block.exec()
+
+    def execCheckpointed(self): #The saved frame holds the running iteration and the total, so resuming doesn't reassign the loop variable
+        start, iterations = resumeFrame() or (0, self.iterations())
+        for iteration in range(start, iterations):
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            self.block.exec()
 
-        return f"{iterator}\n" + "\t" * tabID + f"loop {toValue} {self.block.transpileGl()}"
+    def execCheckpointedInner(self): #Nothing else counts steps while its Block runs, so they are kept in a local until the loop ends
+        start, iterations = resumeFrame() or (0, self.iterations())
+        stepsLeft = checkpointer.nextCheck - checkpointer.steps
+        runBlock = self.block.exec
+        for iteration in range(start, iterations):
+            stepsLeft -= 1
+            if stepsLeft <= 0: stepsLeft = checkpointDue(stepsLeft)
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            runBlock()
+        checkpointer.steps = checkpointer.nextCheck - stepsLeft
+
+    def execCheckpointedNested(self):
+        start, iterations = resumeFrame() or (0, self.iterations())
+        for iteration in range(start, iterations):
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield self.block
+
+    def savedFrame(self, frameLocals): return [frameLocals["iteration"], frameLocals["iterations"]]
 
 class ConditionalInstruction(Token):
+    isCompound = True
+
     def argumentize(self, token):
         self.condition = Condition(token["cond"])
         self.block = Block(token["block"])
 
-    def transpileJs(self):
-        return "(%s) %s" % (self.condition.transpileJs(), self.block.transpileJs())
-    
-    def transpilePy(self):
-        return "%s:%s" % (self.condition.transpilePy(), self.block.transpilePy())
-    
-    def transpileC(self):
-        return "(%s) %s" % (self.condition.transpileC(), self.block.transpileC())
-    
-    def transpileCpp(self):
-        return "(%s) %s" % (self.condition.transpileCpp(), self.block.transpileCpp())
-    
-    def transpileGl(self):
-        return [self.condition.transpileGl(), self.block.transpileGl()]
+    def savedFrame(self, frameLocals): return []
 
 class IfInstruction(ConditionalInstruction):
     def argumentize(self, token):
@@ -396,90 +494,162 @@ class IfInstruction(ConditionalInstruction):
             self.elseBlock = Block(token["else"])
             self.exec = self.execElse
 
+    def setExec(self): #IFs hand back the steps of the Block taken, they are compound only when that Block is
+        blocks = [self.block, self.elseBlock] if hasattr(self, "elseBlock") else [self.block]
+        for block in blocks:
+            if type(block) is LazyBlock: block.holder = self
+        self.depth = max(block.depth for block in blocks)
+        self.hasSteps = any(block.hasSteps for block in blocks)
+        self.isCompound = any(block.isCompound for block in blocks)
+        if self.hasSteps: self.exec = self.execCheckpointedNested if self.isCompound else self.execCheckpointed
+
     def exec(self):
-        if self.condition.exec(): self.block.exec()
+        if self.condition.exec(): return self.block.exec()
     
     def execElse(self):
-        if self.condition.exec(): self.block.exec()
-        else: self.elseBlock.exec()
-    
-    def transpileJs(self):
-        text = f"if{super().transpileJs()}"
-        if hasattr(self, "elseBlock"):
-            text += f" else {self.elseBlock.transpileJs()}"
-        return text
-    
-    def transpilePy(self):
-        text = f"if {super().transpilePy()}"
-        if hasattr(self, "elseBlock"):
-            text += "\n" + "\t" * tabID + f"else:{self.elseBlock.transpilePy()}"
-        return text
-    
-    def transpileC(self):
-        text = f"if{super().transpileC()}"
-        if hasattr(self, "elseBlock"):
-            text += f" else {self.elseBlock.transpileC()}"
-        return text
-    
-    def transpileCpp(self):
-        text = f"if{super().transpileCpp()}"
-        if hasattr(self, "elseBlock"):
-            text += f" else {self.elseBlock.transpileCpp()}"
-        return text
-    
-    def transpileGl(self):
-        text = f"when " + " ".join(super().transpileGl())
-        if hasattr(self, "elseBlock"):
-            text += f" else {self.elseBlock.transpileGl()}"
-        return text
+        return (self.block if self.condition.exec() else self.elseBlock).exec()
 
+    def takenBlock(self): #The saved branch is taken again on resume, the condition may not hold anymore once its block changed some variables
+        frame = resumeFrame()
+        if frame is not None: return self.elseBlock if frame[0] else self.block
+        if self.condition.exec(): return self.block
+        return getattr(self, "elseBlock", None)
+
+    def execCheckpointed(self):
+        block = self.takenBlock()
+        if block is not None: block.exec()
+
+    def execCheckpointedNested(self):
+        block = self.takenBlock()
+        if block is not None: yield block
+
+    def savedFrame(self, frameLocals): return [0 if frameLocals["block"] is self.block else 1]
+    
 class WhileInstruction(ConditionalInstruction):
+    hasSteps = True
+
+    def setExec(self):
+        loopExec(self)
+
     def exec(self):
         while self.condition.exec(): self.block.exec()
 
-    def transpileJs(self):
-        return f"while{super().transpileJs()}"
-    
-    def transpilePy(self):
-        return f"while {super().transpilePy()}"
-    
-    def transpileC(self):
-        return f"while {super().transpileC()}"
-    
-    def transpileCpp(self):
-        return f"while {super().transpileCpp()}"
-    
-    def transpileGl(self):
-        condition, block = super().transpileGl()
-        return f"when {condition} loop {block}"
+    def execMetered(self):
+        while self.condition.exec():
+            metrics.counters["loopIterations"] += 1
+            self.block.exec()
+
+    def execNested(self):
+        while self.condition.exec():
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield self.block
+
+    def execLazy(self):
+        block = self.block
+        while self.condition.exec():
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield block
+            if not block.isCompound: break
+        else: return
+        while self.condition.exec():
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            block.exec()
+
+    def execCheckpointed(self): #A resumed loop goes back into its block before checking the condition again
+        resumed = resumeFrame() is not None
+        while resumed or self.condition.exec():
+            resumed = False
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            self.block.exec()
+
+    def execCheckpointedInner(self):
+        resumed = resumeFrame() is not None
+        stepsLeft = checkpointer.nextCheck - checkpointer.steps
+        runBlock, holds = self.block.exec, self.condition.exec
+        while resumed or holds():
+            resumed = False
+            stepsLeft -= 1
+            if stepsLeft <= 0: stepsLeft = checkpointDue(stepsLeft)
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            runBlock()
+        checkpointer.steps = checkpointer.nextCheck - stepsLeft
+
+    def execCheckpointedNested(self):
+        resumed = resumeFrame() is not None
+        while resumed or self.condition.exec():
+            resumed = False
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield self.block
 
 class RepeatInstruction(ConditionalInstruction):
+    hasSteps = True
+
+    def setExec(self):
+        loopExec(self)
+
     def exec(self):
         while True:
             self.block.exec()
             if self.condition.exec(): break
-    
-    def transpileJs(self):
-        blockText = self.block.transpileJs()[:-2] + (tabID + 1) * "\t" + f"if({self.condition.transpileJs()}) break;\n" + tabID * "\t" + "}"
-        return f"while(true) {blockText}"
-    
-    def transpilePy(self):
-        blockText = self.block.transpilePy() + "\n" + (tabID + 1) * "\t" + f"if {self.condition.transpilePy()}: break\n"
-        return f"while True:{blockText}"
-    
-    def transpileC(self):
-        blockText = self.block.transpileC()[:-2] + (tabID + 1) * "\t" + f"if({self.condition.transpileC()}) break;\n" + tabID * "\t" + "}"
-        return f"while(1) {blockText}"
-    
-    def transpileCpp(self):
-        blockText = self.block.transpileCpp()[:-2] + (tabID + 1) * "\t" + f"if({self.condition.transpileCpp()}) break;\n" + tabID * "\t" + "}"
-        return f"while(true) {blockText}"
-    
-    def transpileGl(self):
-        condition, block = super().transpileGl()
-        blockText = block[:-2] + "\n" + (tabID + 1) * "\t" + f"when {condition} then exit\n" + tabID * "\t" + "}"
-        return f"when TRUE loop {blockText}"
 
+    def execMetered(self):
+        while True:
+            metrics.counters["loopIterations"] += 1
+            self.block.exec()
+            if self.condition.exec(): break
+
+    def execNested(self):
+        while True:
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield self.block
+            if self.condition.exec(): break
+
+    def execLazy(self):
+        block = self.block
+        while True:
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield block
+            if self.condition.exec(): return
+            if not block.isCompound: break
+        while True:
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            block.exec()
+            if self.condition.exec(): break
+
+    def execCheckpointed(self):
+        resumeFrame()
+        while True:
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            self.block.exec()
+            if self.condition.exec(): break
+
+    def execCheckpointedInner(self):
+        resumeFrame()
+        stepsLeft = checkpointer.nextCheck - checkpointer.steps
+        runBlock, holds = self.block.exec, self.condition.exec
+        while True:
+            stepsLeft -= 1
+            if stepsLeft <= 0: stepsLeft = checkpointDue(stepsLeft)
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            runBlock()
+            if holds(): break
+        checkpointer.steps = checkpointer.nextCheck - stepsLeft
+
+    def execCheckpointedNested(self):
+        resumeFrame()
+        while True:
+            checkpointer.steps += 1
+            if checkpointer.steps >= checkpointer.nextCheck: checkpointReached()
+            if metrics is not None: metrics.counters["loopIterations"] += 1
+            yield self.block
+            if self.condition.exec(): break
+    
 class Operation(Token):
     def argumentize(self, token):
         self.op1 = Identifier(token["op1"])
@@ -506,36 +676,6 @@ class Operation(Token):
         op2 = self.op2.exec()
         return op1, op2 - op1
 
-    def transpileJs(self):
-        if self.op == "MOD": self.op = "%"
-        op1 = self.op1.transpileJs()
-        op2 = self.op2.transpileJs()
-        return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
-    
-    def transpilePy(self):
-        if self.op == "MOD": self.op = "%"
-        op1 = self.op1.transpilePy()
-        op2 = self.op2.transpilePy()
-        return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
-    
-    def transpileC(self):
-        if self.op == "MOD": self.op = "%"
-        op1 = self.op1.transpileC()
-        op2 = self.op2.transpileC()
-        return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
-    
-    def transpileCpp(self):
-        if self.op == "MOD": self.op = "%"
-        op1 = self.op1.transpileCpp()
-        op2 = self.op2.transpileCpp()
-        return (op1, op2) if self.op == "TO" else f"{op1} {self.op} {op2}"
-    
-    def transpileGl(self):
-        if self.op == "MOD": self.op = "%"
-        op1 = self.op1.transpileGl()
-        op2 = self.op2.transpileGl()
-        return (op1, op2) if self.op == "TO" else f"{op1} {op2} {self.op}"
-
 class Condition(Token):
     def argumentize(self, token):
         self.cp1 = distinguishIdOp(token["cp1"])
@@ -550,76 +690,54 @@ class Condition(Token):
             "!=" : self.execNeq,
         })[self.cp]
     
-    def execLst(self): return self.cp1.exec() <  self.cp2.exec()
-    def execLet(self): return self.cp1.exec() <= self.cp2.exec()
-    def execEqs(self): return self.cp1.exec() == self.cp2.exec()
-    def execGrt(self): return self.cp1.exec() >  self.cp2.exec()
-    def execGet(self): return self.cp1.exec() >= self.cp2.exec()
-    def execNeq(self): return self.cp1.exec() != self.cp2.exec()
-
-    def transpileJs(self):
-        cp1 = self.cp1.transpileJs()
-        if type(self.cp1) is Operation: cp1 = f"({cp1})"
-
-        cp2 = self.cp2.transpileJs()
-        if type(self.cp2) is Operation: cp2 = f"({cp2})"
-
-        return f"{cp1} {self.cp} {cp2}"
-    
-    def transpilePy(self):
-        cp1 = self.cp1.transpilePy()
-        if type(self.cp1) is Operation: cp1 = f"({cp1})"
-
-        cp2 = self.cp2.transpilePy()
-        if type(self.cp2) is Operation: cp2 = f"({cp2})"
-
-        return f"{cp1} {self.cp} {cp2}"
-    
-    def transpileC(self):
-        cp1 = self.cp1.transpileC()
-        if type(self.cp1) is Operation: cp1 = f"({cp1})"
-
-        cp2 = self.cp2.transpileC()
-        if type(self.cp2) is Operation: cp2 = f"({cp2})"
-
-        return f"{cp1} {self.cp} {cp2}"
-    
-    def transpileCpp(self):
-        cp1 = self.cp1.transpileCpp()
-        if type(self.cp1) is Operation: cp1 = f"({cp1})"
-
-        cp2 = self.cp2.transpileCpp()
-        if type(self.cp2) is Operation: cp2 = f"({cp2})"
-
-        return f"{cp1} {self.cp} {cp2}"
-    
-    def transpileGl(self):
-        cp1 = self.cp1.transpileGl()
-        cp2 = self.cp2.transpileGl()
-        return f"{cp1} {cp2} {self.cp}"
+    def execLst(self):
+        result = self.cp1.exec() <  self.cp2.exec()
+        return result if type(result) is bool else truthValue(result)
+    def execLet(self):
+        result = self.cp1.exec() <= self.cp2.exec()
+        return result if type(result) is bool else truthValue(result)
+    def execEqs(self):
+        result = self.cp1.exec() == self.cp2.exec()
+        return result if type(result) is bool else truthValue(result)
+    def execGrt(self):
+        result = self.cp1.exec() >  self.cp2.exec()
+        return result if type(result) is bool else truthValue(result)
+    def execGet(self):
+        result = self.cp1.exec() >= self.cp2.exec()
+        return result if type(result) is bool else truthValue(result)
+    def execNeq(self):
+        result = self.cp1.exec() != self.cp2.exec()
+        return result if type(result) is bool else truthValue(result)
 
 class Identifier(Token):
     def argumentize(self, token):
         self.value = token["value"]
+        self.isVar = token["isVar"]
         self.exec = self.execVar if token["isVar"] else self.execNum
         self.isMsg = not token["isVar"] and type(token["value"]) is str
+        self.index = Identifier(token["index"]) if "index" in token else None
+        self.isLength = "length" in token
+        if self.index is not None: self.exec = self.execItem
+        elif self.isLength: self.exec = self.execLength
 
     def execNum(self): return self.value
     def execVar(self):
         if self.value not in runtime_vars: raise RuntimeError(f"Undefined variable \"{self.value}\"")
         return runtime_vars[self.value]
-    
-    def transpileJs(self):
-        return f"\"{self.value}\"" if self.isMsg else str(self.value)
-    
-    def transpilePy(self):
-        return f"\"{self.value}\"" if self.isMsg else str(self.value)
-    
-    def transpileC(self):
-        return f"\"{self.value}\"" if self.isMsg else f"{self.value}"
-    
-    def transpileCpp(self):
-        return f"\"{self.value}\"" if self.isMsg else f"{self.value}"
-    
-    def transpileGl(self):
-        return f"\"{self.value}\"" if self.isMsg else f"{self.value}"
\ No newline at end of file
+    def execItem(self):
+        array, index = arrayIndex(self.value, self.index.exec())
+        return array[index]
+    def execLength(self): return len(arrayValue(self.value))
+    
+CHECKPOINTED_LOCALS = { #Frames savedPosition reads the position from, with the locals the savedFrame of their node reads in them
+    Block.execCheckpointed : ("line",), Block.execCheckpointedNested : ("line",),
+    ReadInstruction.execCheckpointed : ("valueID",),
+    ForInstruction.execCheckpointed : ("iteration", "iterations"), ForInstruction.execCheckpointedInner : ("iteration", "iterations"), ForInstruction.execCheckpointedNested : ("iteration", "iterations"),
+    IfInstruction.execCheckpointed : ("block",), IfInstruction.execCheckpointedNested : ("block",),
+    WhileInstruction.execCheckpointed : (), WhileInstruction.execCheckpointedInner : (), WhileInstruction.execCheckpointedNested : (),
+    RepeatInstruction.execCheckpointed : (), RepeatInstruction.execCheckpointedInner : (), RepeatInstruction.execCheckpointedNested : (),
+}
+for function, names in CHECKPOINTED_LOCALS.items(): #Renaming one of them would only break the checkpoints saved from then on, so it fails the import instead
+    missing = [name for name in names if name not in function.__code__.co_varnames]
+    if missing: raise ImportError(f"{function.__qualname__} no longer has the locals {', '.join(missing)} its checkpoints are saved from.")
+CHECKPOINTED_EXECS = {function.__code__ for function in CHECKPOINTED_LOCALS}
@@ -1,25 +1,171 @@
 #The code that follows is pretty bad, viewer discretion is advised.
+#Usage: main.py run|transpile|check|dump|bench PATH [options], see main.py -h. Every command but dump also takes binary ASTs written by dump --binary. main.py NAME [options] still works on ./FILES/NAME.sudo interactively.
+#Commands only import what they use: backends, metrics, checkpoints and bench load on demand, so every invocation starts fast.
+import os
 import sys
-from interpreter import Interpreter
+from interpreter import Interpreter, StreamInterpreter
+from grammar import TableParser
 
 sys.tracebacklimit = 0
 
+COMMANDS = ("run", "transpile", "check", "dump", "bench")
+
 def main():
+    if sys.argv[1:2] == ["bench"]: #Its options are bench.py's own, argparse would try to read them
+        import bench
+        return bench.main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] in (*COMMANDS, "-h", "--help"): return runCommand(readArguments(sys.argv[1:]))
+
+    metricsFile = readOption("--metrics")
+    if "--stream" in sys.argv[2:]: #Runs right away, the program is never built whole so there's nothing to transpile
+        interpreter = StreamInterpreter(readFileName(), toggle_dbgMode = False, toggle_metrics = metricsFile is not None, toggle_cse = "--cse" in sys.argv[2:], toggle_memory = "--metrics-memory" in sys.argv[2:])
+        interpreter.run()
+        if metricsFile is not None: interpreter.metrics.dump(metricsFile)
+        return
+
     fileLines = readFile()
-    interpreter = Interpreter(fileLines, toggle_dbgMode = False)
+    interpreter = Interpreter(fileLines, toggle_dbgMode = False, toggle_lazyBuild = "--lazy" in sys.argv[2:], toggle_metrics = metricsFile is not None, checkpointer = readCheckpointer(), toggle_tableParser = "--recursive-parser" not in sys.argv[2:], toggle_cse = "--cse" in sys.argv[2:], toggle_memory = "--metrics-memory" in sys.argv[2:])
     interpreter.build()
+    resumeFile = readOption("--resume")
     while True:
         runChoice = input("wish to run latest build (-i | -t)? ").lower()
-        if   runChoice == "-i" : interpreter.run()
+        if   runChoice == "-i" :
+            interpreter.run(resume_from = resumeFile)
+            resumeFile = None
         elif runChoice == "-t" : interpreter.transpile()
         else: break
 
-def readFile():
+    if metricsFile is not None: interpreter.metrics.dump(metricsFile)
+
+def readArguments(argv):
+    import argparse
+    argParser = argparse.ArgumentParser(prog = "main.py", description = "Run, transpile, check or dump pseudocode programs.")
+    commands = argParser.add_subparsers(dest = "command", required = True)
+
+    run = commands.add_parser("run", help = "run a program, only its READs prompt for input")
+    run.add_argument("path", help = "path of the .sudo program")
+    run.add_argument("--stream", action = "store_true", help = "parse and run one top-level statement at a time")
+    run.add_argument("--lazy", action = "store_true", help = "build Blocks right before they first run")
+    run.add_argument("--metrics", metavar = "FILE", help = "write the pipeline metrics to FILE as JSON")
+    run.add_argument("--metrics-memory", action = "store_true", help = "also trace the peak memory of every phase, which slows them down several times")
+    run.add_argument("--checkpoint", metavar = "FILE", help = "periodically save the program state to FILE")
+    run.add_argument("--checkpoint-steps", type = int, metavar = "N", help = "checkpoint every N loop iterations and READ values")
+    run.add_argument("--checkpoint-seconds", type = float, metavar = "S", help = "checkpoint every S seconds")
+    run.add_argument("--resume", metavar = "FILE", help = "resume the program from the checkpoint FILE")
+    run.add_argument("--recursive-parser", action = "store_true", help = "parse with the recursive Parser instead of the table-driven one")
+    run.add_argument("--cse", action = "store_true", help = "reuse the values of expressions computed again while their operands didn't change")
+    run.add_argument("--debug", action = "store_true", help = "print the AST, the reused values and the final variables")
+
+    transpile = commands.add_parser("transpile", help = "transpile a program to one or more languages")
+    transpile.add_argument("path", help = "path of the .sudo program")
+    transpile.add_argument("--lang", required = True, help = "comma separated target languages among js, py, c, cpp and gl")
+    transpile.add_argument("--out-dir", help = "directory of the transpiled files, the one of the program by default")
+    transpile.add_argument("--cse", action = "store_true", help = "reuse the values of expressions computed again, through temporaries when needed")
+    transpile.add_argument("--metrics", metavar = "FILE", help = "write the pipeline metrics to FILE as JSON, the transpile phase counts one call per language")
+    transpile.add_argument("--metrics-memory", action = "store_true", help = "also trace the peak memory of every phase, which slows them down several times")
+
+    check = commands.add_parser("check", help = "parse and build programs without running them")
+    check.add_argument("paths", nargs = "+", metavar = "path", help = "paths of the .sudo programs")
+
+    dump = commands.add_parser("dump", help = "write the AST of a program, as text or as a binary AST the other commands load without parsing")
+    dump.add_argument("path", help = "path of the .sudo program")
+    dump.add_argument("--binary", action = "store_true", help = "write the binary format instead of the text one")
+    dump.add_argument("--out", metavar = "FILE", help = "file to write the AST to, the standard output by default")
+    dump.add_argument("--cse", action = "store_true", help = "dump the AST rewritten by common-subexpression elimination")
+
+    commands.add_parser("bench", help = "run bench.py, the options that follow are its own", add_help = False)
+    return argParser.parse_args(argv)
+
+def runCommand(args): #Returns the exit status
+    if args.command == "check": return checkPrograms(args.paths)
+    if args.command == "dump": return dumpProgram(args.path, args.binary, args.out, args.cse)
+
+    if args.command == "transpile":
+        interpreter = Interpreter(readPath(args.path), toggle_metrics = args.metrics is not None, toggle_cse = args.cse, toggle_memory = args.metrics_memory, directory = sourceDirectory(args.path))
+        interpreter.build(doPrint = False)
+        stem = os.path.splitext(os.path.basename(args.path))[0]
+        for lang in args.lang.split(","): interpreter.transpile(lang, os.path.join(args.out_dir or os.path.dirname(args.path), f"{stem}.{lang}"))
+        if args.metrics is not None: interpreter.metrics.dump(args.metrics)
+        return 0
+
+    if args.stream:
+        if args.lazy or args.checkpoint or args.resume or args.recursive_parser: raise Exception("Streamed programs can't be built lazily, checkpointed or parsed recursively.")
+        if type(readPath(args.path, doRead = False)) is bytes: raise Exception("Binary ASTs can't be streamed, run them without --stream.")
+        interpreter = StreamInterpreter(args.path, toggle_dbgMode = args.debug, toggle_metrics = args.metrics is not None, toggle_cse = args.cse, toggle_memory = args.metrics_memory)
+        interpreter.run()
+    else:
+        checkpointer = None
+        if args.checkpoint is not None:
+            from checkpoint import Checkpointer
+            checkpointer = Checkpointer(args.checkpoint, args.checkpoint_steps, args.checkpoint_seconds)
+        interpreter = Interpreter(readPath(args.path), toggle_dbgMode = args.debug, toggle_lazyBuild = args.lazy, toggle_metrics = args.metrics is not None, checkpointer = checkpointer, toggle_tableParser = not args.recursive_parser, toggle_cse = args.cse, toggle_memory = args.metrics_memory, directory = sourceDirectory(args.path))
+        interpreter.build(doPrint = False)
+        interpreter.run(resume_from = args.resume)
+    if args.metrics is not None: interpreter.metrics.dump(args.metrics)
+    return 0
+
+def checkPrograms(paths): #Reports on every program, the exit status tells whether all of them built
+    failures = 0
+    for path in paths:
+        try:
+            Interpreter(readPath(path), directory = sourceDirectory(path)).build(doPrint = False)
+            print(f"{path}: ok")
+        except Exception as error:
+            failures += 1
+            print(f"{path}: {error}")
+    return 1 if failures else 0
+
+def dumpProgram(path, binary, outFile, cse = False): #Writes to the standard output without outFile
+    import astdump
+    fileContent = readPath(path)
+    program = astdump.loadBinary(fileContent) if type(fileContent) is bytes else TableParser(fileContent, directory = sourceDirectory(path)).parse()
+    if cse:
+        from cse import eliminate
+        program = eliminate(program)[0]
+    fd = open(outFile, "wb" if binary else "w") if outFile is not None else sys.stdout.buffer if binary else sys.stdout
+    try:
+        astdump.dump(program, fd, "binary" if binary else "text")
+        if not binary: fd.write("\n")
+    finally:
+        if outFile is not None: fd.close()
+    return 0
+
+def readPath(path, doRead = True): #Source files come back as text and binary ASTs as bytes, without doRead only the header of the binary ones
+    from astdump import MAGIC, isBinary
+    try:
+        with open(path, "rb") as fd:
+            header = fd.read(len(MAGIC))
+            if isBinary(header): return header + fd.read() if doRead else header
+        if not doRead: return None
+        with open(path) as fd: return fd.read()
+    except OSError: raise Exception(f"Couldn't open file \"{path}\": file not found or not readable.") from None
+
+def sourceDirectory(path): #INCLUDEd modules are looked for next to the program
+    return os.path.dirname(os.path.abspath(path))
+
+def readOption(option):
+    if option not in sys.argv[2:]: return None
+    optionID = sys.argv.index(option, 2)
+    if optionID + 1 >= len(sys.argv): raise Exception(f"Missing value for option \"{option}\".")
+    return sys.argv[optionID + 1]
+
+def readCheckpointer():
+    checkpointFile = readOption("--checkpoint")
+    if checkpointFile is None: return None
+    from checkpoint import Checkpointer
+    everySteps, everySeconds = readOption("--checkpoint-steps"), readOption("--checkpoint-seconds")
+    return Checkpointer(checkpointFile, everySteps and int(everySteps), everySeconds and float(everySeconds))
+
+def readFileName():
     if len(sys.argv) < 2: raise Exception("Missing filename, specify target filename to interpret.")
     fileName = f"./FILES/{sys.argv[1]}.sudo"
-    
+    if not os.path.isfile(fileName): raise Exception("Couldn't open file: invalid filename or file not found, do not include path informations or file extensions.")
+    return fileName
+
+def readFile():
+    fileName = readFileName()
     try: return open(fileName).read()
     except: raise Exception("Couldn't open file: invalid filename or file not found, do not include path informations or file extensions.") from None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# Module for collecting pipeline metrics, only imported when an Interpreter is created with toggle_metrics
+import json
+import time
+import tracemalloc
+
+def countNodes(program):
+    count, stack = 0, [program]
+    while stack:
+        node = stack.pop()
+        if type(node) is list: stack.extend(node)
+        elif type(node) is dict:
+            if "type" in node: count += 1
+            stack.extend(node.values())
+    return count
+
+class Metrics:
+    def __init__(self, trackMemory = False): #Tracing memory slows the measured phases down several times, so their peaks are opt-in
+        self.phases = {}
+        self.counters = {
+            "tokens"         : 0,
+            "nodes"          : 0,
+            "loopIterations" : 0,
+            "writes"         : 0,
+            "reads"          : 0,
+            "cseEliminated"  : 0,
+        }
+        self.peakMemory = 0 if trackMemory else None #Written as null when memory isn't traced, a 0 would read like a measurement
+        self.hooks = []
+        self.trackMemory = trackMemory
+
+    def addHook(self, callback): #callback(phaseName, metrics) is called every time a phase ends
+        self.hooks.append(callback)
+
+    def count(self, counterName, amount = 1):
+        self.counters[counterName] = self.counters.get(counterName, 0) + amount
+
+    def addTime(self, phaseName, wall, cpu):
+        phase = self.phases.setdefault(phaseName, {"calls" : 0, "wall" : 0.0, "cpu" : 0.0})
+        phase["calls"] += 1
+        phase["wall"]  += wall
+        phase["cpu"]   += cpu
+        return phase
+
+    def measure(self, phaseName, function, *args, **kwargs):
+        startedTracing = self.trackMemory and not tracemalloc.is_tracing() #Tracing is process-wide, it only lasts as long as the phase that started it
+        if startedTracing: tracemalloc.start()
+        elif self.trackMemory: tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try: return function(*args, **kwargs)
+        finally:
+            phase = self.addTime(phaseName, time.perf_counter() - wall, time.process_time() - cpu)
+            if self.trackMemory:
+                peak = tracemalloc.get_traced_memory()[1]
+                if startedTracing: tracemalloc.stop()
+                phase["peakMemory"] = max(phase.get("peakMemory", 0), peak)
+                self.peakMemory = max(self.peakMemory, peak)
+            for hook in self.hooks: hook(phaseName, self)
+
+    def meterTokens(self, getNextToken):
+        def meteredGetNextToken():
+            wall, cpu = time.perf_counter(), time.process_time()
+            token = getNextToken()
+            self.addTime("tokenize", time.perf_counter() - wall, time.process_time() - cpu)
+            if token is not None: self.counters["tokens"] += 1
+            return token
+        return meteredGetNextToken
+
+    def toDict(self):
+        return {
+            "phases"     : self.phases,
+            "counters"   : self.counters,
+            "peakMemory" : self.peakMemory,
+        }
+
+    def dump(self, fileName):
+        with open(fileName, "w") as fd: json.dump(self.toDict(), fd, indent = 4)
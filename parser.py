@@ -1,28 +1,80 @@
+import os
 from tokenizer import Tokenizer
 
-def formatNode(node, indent = ""):
-    if type(node) not in (list, dict): return str(node)
+MODULES_DIRECTORY = "./FILES" #Where INCLUDEs are looked for when the program wasn't read from a file
+moduleCache = {} #(content hash, directory) -> (parsed Program, content hashes of the modules it INCLUDEs) of every module INCLUDEd so far by this process
 
-    nextIndent = indent + "⋮ "
-    res, iterator, ending = ("[", node, "]") if type(node) is list else ("{", node.items(), "}")
-    
-    for item in iterator:
-        res += f"\n{nextIndent}"
-        itemIsList = type(item) is tuple
-        if itemIsList and item[0] != "type": res += f"{item[0]} : "
-        res += formatNode(item[1] if itemIsList else item, nextIndent)
+def formatNode(node): #The debug dump of node as a string, astdump.dumpText writes it to a file without holding it whole
+    import io
+    from astdump import dumpText
+    buffer = io.StringIO()
+    dumpText(node, buffer)
+    return buffer.getvalue()
+
+def printNode(node):
+    import sys
+    from astdump import dumpText
+    dumpText(node, sys.stdout)
+    print()
+
+def contentHash(fileContent):
+    import hashlib #Loading OpenSSL is a good part of the startup time, programs that neither INCLUDE nor checkpoint never pay for it
+    return hashlib.sha256(fileContent.encode()).hexdigest()
+
+def readModule(moduleName, directory): #Modules sit next to the file INCLUDing them or in the FILES folder beside it, returns the content and the directory it was found in
+    paths = [os.path.join(directory, f"{moduleName}.sudo"), os.path.join(directory, "FILES", f"{moduleName}.sudo")]
+    for path in paths:
+        try:
+            with open(path) as fd: return fd.read(), os.path.dirname(path)
+        except OSError: pass
+    raise Exception(f"Couldn't INCLUDE module \"{moduleName}\": none of {', '.join(paths)} found.")
+
+def includeModule(moduleName, includeStack, parserClass, includedHashes, directory): #Returns the top-level lines of the module, parsing it with parserClass only the first time its content is seen. Its hash and the ones of the modules it INCLUDEs go into includedHashes
+    fileContent, moduleDirectory = readModule(moduleName, directory)
+    moduleHash = contentHash(fileContent)
+    if any(moduleHash == includedHash for includedHash, _ in includeStack):
+        cycle = " -> ".join(name for _, name in includeStack)
+        raise Exception(f"Circular INCLUDE detected: {cycle} -> {moduleName}")
+
+    cacheKey = (moduleHash, moduleDirectory) #The same content elsewhere may INCLUDE other files
+    if cacheKey not in moduleCache:
+        moduleParser = parserClass(fileContent, moduleName, includeStack, moduleDirectory)
+        moduleCache[cacheKey] = moduleParser.parse(), moduleParser.includedHashes
+    program, moduleIncludes = moduleCache[cacheKey]
+    includedHashes.append(moduleHash)
+    includedHashes.extend(moduleIncludes)
+    return program["value"]
 
-    return f"{res}\n{indent}{ending}"
+def requireUntil(expression): #REPEATs take their UNTIL from their own line or the next one, the Lines holding them only know they have none once another line follows
+    if expression is not None and expression["type"] == "REPEAT-INSTR" and "cond" not in expression: raise Exception("REPEAT without UNTIL")
 
-class Parser:
-    def __init__(self, fileContent):
+class ModuleParser: #includeStack holds the (content hash, name) pairs of the modules INCLUDing this one and its own, hashed the first time an INCLUDE or a checkpoint needs it
+    def __init__(self, moduleName, includeStack, directory = MODULES_DIRECTORY):
+        self.moduleName = moduleName
+        self.directory = directory #INCLUDEs are resolved from here
+        self.parentStack = includeStack
+        self.ownStack = None
+        self.includedHashes = [] #Content hashes of every module INCLUDEd while parsing, nested ones included
+
+    @property
+    def includeStack(self):
+        if self.ownStack is None: self.ownStack = (*self.parentStack, (self.sourceHash(), self.moduleName))
+        return self.ownStack
+
+    def sourceHash(self): return contentHash(self.fileContent)
+
+class Parser(ModuleParser):
+    def __init__(self, fileContent, moduleName = "<main>", includeStack = (), directory = MODULES_DIRECTORY):
+        super().__init__(moduleName, includeStack, directory)
         self.tokenizer = Tokenizer("{" + fileContent + "}") #It takes me half an hour to explain why the {...}\n is needed, don't bother asking
+        self.fileContent = fileContent
+        self.nextToken = self.tokenizer.getNextToken
     
     def parse(self, doPrint=False):
-        self.lookahead = self.tokenizer.getNextToken()
+        self.lookahead = self.nextToken()
         program = self.Program(isFirst=True)
         if self.lookahead is not None: raise Exception(f"Trailing content ({self.lookahead['value']}) was detected outside of main program.")
-        if doPrint: print(formatNode(program))
+        if doPrint: printNode(program)
         return program
     
     def Program(self, isFirst = False):
@@ -33,22 +85,29 @@ class Parser:
         }
         if self.lookahead is None: return token
         
+        prevExpr = None
         while self.lookahead["type"] != "closeBlock":
             if self.lookahead["type"] == "newline":
                 self.eat("newline")
-                if self.lookahead is None: return token
+                if self.lookahead is None:
+                    requireUntil(prevExpr)
+                    return token
                 continue
             
             latestExpr = self.Expression()["value"]
+            if latestExpr["type"] != "UNTIL-INSTR": requireUntil(prevExpr)
             if latestExpr["type"] == "ELSE-INSTR":
-                if token["value"][-1]["type"] == "IF-INSTR": token["value"][-1]["else"] = latestExpr["block"]
+                if prevExpr is not None and prevExpr["type"] == "IF-INSTR": prevExpr["else"] = latestExpr["block"]
                 else: raise Exception("Unexpected \"ELSE\"")
             
             elif latestExpr["type"] == "UNTIL-INSTR":
-                if token["value"][-1]["type"] == "REPEAT-INSTR": token["value"][-1]["cond"] = latestExpr["cond"]
+                if prevExpr is not None and prevExpr["type"] == "REPEAT-INSTR": prevExpr["cond"] = latestExpr["cond"]
                 else: raise Exception("Unexpected \"UNTIL\"")
             
+            elif latestExpr["type"] == "INCLUDE-INSTR": token["value"].extend(latestExpr["value"]) #Cached module lines are shared, so they can't be the target of a following ELSE/UNTIL
             else: token["value"].append(latestExpr)
+            prevExpr = latestExpr
+        requireUntil(prevExpr)
         self.eat("closeBlock")
         
         return token
@@ -64,13 +123,19 @@ class Parser:
 
     def Assignment(self, allowTo = False):
         target = self.eat("WORD")["value"]
+        index = None
+        if self.lookahead is not None and self.lookahead["type"] == "[":
+            index = self.Subscript()
+            if index is None: raise Exception(f"Cannot assign to \"{target}[]\", assign to the whole array or to one of its elements.")
         self.eat("arrow")
         value = self.Operation(allowTo)
-        return {
+        token = {
             "type"   : "Assignment",
             "target" : target,
             "value"  : value
         }
+        if index is not None: token["index"] = index
+        return token
 
     def Instruction(self):
         keyword = self.eat("KEYWORD")["value"]
@@ -82,6 +147,7 @@ class Parser:
         if keyword == "WHILE" : return self.WHILE()
         if keyword == "REPEAT": return self.REPEAT()
         if keyword == "UNTIL" : return self.UNTIL()
+        if keyword == "INCLUDE": return self.INCLUDE()
         raise Exception(f"Unrecognized Instruction {keyword}")
 
     def WRITE(self):
@@ -91,10 +157,13 @@ class Parser:
         }
 
     def READ(self):
-        return {
+        values = self.List()
+        token = {
             "type"  : "READ-INSTR",
-            "value" : self.List()["value"]
+            "value" : values["value"]
         }
+        if "arrays" in values: token["arrays"] = values["arrays"]
+        return token
     
     def IF(self):
         condition = self.Condition()
@@ -120,6 +189,7 @@ class Parser:
     
     def FOR(self):
         iters = self.Assignment(allowTo = True)
+        if "index" in iters: raise Exception("FOR-INSTR loop variable can't be an array element.")
         doKW = self.eat("KEYWORD")["value"]
         if doKW != "DO": raise Exception(f"Unexpected KEYWORD \"{doKW}\", expected \"DO\"")
         return {
@@ -144,7 +214,7 @@ class Parser:
             "block" : self.Block()
         }
 
-        if self.lookahead and self.lookahead["type"] != "newline":
+        if self.lookahead and self.lookahead["type"] not in ("newline", "closeBlock"): #Without UNTIL here, the Lines holding the REPEAT look for it on the next line
             self.eat("KEYWORD")
             token["cond"] = self.UNTIL()["cond"]
 
@@ -156,6 +226,12 @@ class Parser:
             "cond" : self.Condition(),
         }
 
+    def INCLUDE(self):
+        return {
+            "type"  : "INCLUDE-INSTR",
+            "value" : includeModule(self.eat("WORD")["value"], self.includeStack, Parser, self.includedHashes, self.directory)
+        }
+
     def Message(self):
         return {
             "type"  : "Identifier",
@@ -164,17 +240,24 @@ class Parser:
         }
 
     def List(self):
-        wordList = []
-        wordList.append(self.eat("WORD")["value"])
-        while self.lookahead["type"] == ",":
+        wordList, arrays = [], []
+        while True:
+            word = self.eat("WORD")["value"]
+            if self.lookahead is not None and self.lookahead["type"] == "[":
+                index = self.Subscript()
+                if index is not None: raise Exception(f"Cannot READ the single element \"{word}[{index['value']}]\", READ the whole array as \"{word}[]\".")
+                arrays.append(word)
+            wordList.append(word)
+            if self.lookahead is None or self.lookahead["type"] != ",": break
             self.eat(",")
-            wordList.append(self.eat("WORD")["value"])
         
         if len(wordList) == 1: wordList = wordList[0]
-        return {
+        token = {
             "type" : "list",
             "value" : wordList
         }
+        if arrays: token["arrays"] = arrays
+        return token
 
     def Condition(self):
         cp1 = self.Operation()
@@ -195,7 +278,9 @@ class Parser:
 
         if self.lookahead is None: raise Exception("Abrupt ending block")
         if self.lookahead["type"] != "openBlock": 
-            token["value"] = [self.Expression(eatNewline = False)["value"]]
+            expression = self.Expression(eatNewline = False)["value"]
+            requireUntil(expression) #The next line belongs to the Lines holding the Block, it can't be the UNTIL of this REPEAT
+            token["value"] = expression["value"] if expression["type"] == "INCLUDE-INSTR" else [expression]
             return token
 
         token["value"] = self.Program()["value"]
@@ -215,7 +300,21 @@ class Parser:
         token["op2"]     = op2
         return token
 
-    def Identifier(self):
+    def Identifier(self): #"data[i]" reads an element, "data[]" the length of the array
+        token = self.Index()
+        if token["isVar"] and self.lookahead is not None and self.lookahead["type"] == "[":
+            index = self.Subscript()
+            if index is None: token["length"] = True
+            else: token["index"] = index
+        return token
+
+    def Subscript(self): #Returns the Identifier of the index, None for "[]"
+        self.eat("[")
+        index = None if self.lookahead is not None and self.lookahead["type"] == "]" else self.Index()
+        self.eat("]")
+        return index
+
+    def Index(self):
         if self.lookahead is None: raise Exception("Abrupt ending in Identifier")
         value = self.eat("NUMBER") if self.lookahead["type"] == "NUMBER" else self.eat("WORD")
         if value["type"] == "NUMBER": value["value"] = float(value["value"]) if "." in value["value"] else int(value["value"])
@@ -229,5 +328,5 @@ class Parser:
         token = self.lookahead
         if token is None: raise Exception("Unexpected End Of Input")
         if tokenType != token["type"]: raise Exception(f"Expected \"{tokenType}\" but got \"{token['type']}\"")
-        self.lookahead = self.tokenizer.getNextToken()
+        self.lookahead = self.nextToken()
         return token
\ No newline at end of file
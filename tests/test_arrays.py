@@ -0,0 +1,105 @@
+#Array variables: READ from .txt, .npy and raw float64 files, indexed and combined elementwise the same way by the interpreter and by the transpiled Python
+import builtins
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arrays import loadArray
+from interpreter import Interpreter
+
+try: import numpy
+except ImportError: numpy = None
+
+VALUES = [1, 2, 3, 4.5]
+PROGRAM = "\n".join([ #The walk is the idiom of the arrays.py header, FOR never sets its variable
+    "READ d[]",
+    "e <- d * 2",
+    "f <- d + e",
+    "WRITE f",
+    "WRITE d[]",
+    "d[1] <- 7",
+    "WRITE d[1] - d[0]",
+    "i <- 0",
+    "s <- 0",
+    "WHILE i < d[] DO {",
+    "    s <- s + d[i]",
+    "    i <- i + 1",
+    "}",
+    "WRITE s",
+])
+OUTPUT = ["3.0 6.0 9.0 13.5", "4", "6.0", "15.5"]
+INDEX_ERRORS = { #Value of the index k -> message, the same from the interpreter and from the transpiled Python
+    "1.5" : "Invalid index 1.5 for array \"d\" of length 4.",
+    "0 - 1" : "Invalid index -1 for array \"d\" of length 4.",
+    "d[]" : "Invalid index 4 for array \"d\" of length 4.",
+}
+
+@unittest.skipIf(numpy is None, "Array variables need NumPy.")
+class ArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.files = {}
+        for extension in (".txt", ".npy", ".bin"):
+            self.files[extension] = os.path.join(self.directory.name, f"d{extension}")
+        with open(self.files[".txt"], "w") as fd: fd.write(" ".join(map(str, VALUES)))
+        numpy.save(self.files[".npy"], numpy.array(VALUES, dtype = numpy.float64))
+        numpy.array(VALUES, dtype = numpy.float64).tofile(self.files[".bin"])
+        self.fileName = self.files[".txt"]
+        self.input, builtins.input = builtins.input, lambda prompt = "": self.fileName
+
+    def tearDown(self):
+        builtins.input = self.input
+        self.directory.cleanup()
+
+    def runProgram(self, source):
+        program = Interpreter(source)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            program.build()
+            program.run()
+        return out.getvalue().splitlines()[1:-1]
+
+    def runTranspiled(self, source):
+        program = Interpreter(source)
+        with contextlib.redirect_stdout(io.StringIO()): program.build()
+        namespace = {"__name__" : "transpiled"}
+        exec(compile(program.transpileText("py"), "transpiled.py", "exec"), namespace)
+        with contextlib.redirect_stdout(io.StringIO()) as out: namespace["main"]()
+        return out.getvalue().splitlines()
+
+    def testLoads(self): #Item assignments never reach the memory-mapped files
+        for extension, fileName in self.files.items():
+            with self.subTest(file = extension):
+                self.fileName = fileName
+                self.assertEqual(self.runProgram(PROGRAM), OUTPUT)
+                self.assertEqual(self.runTranspiled(PROGRAM), OUTPUT)
+                self.assertEqual(list(loadArray(fileName)), VALUES)
+
+    def testMissingFile(self):
+        self.fileName = os.path.join(self.directory.name, "missing.npy")
+        with self.assertRaisesRegex(RuntimeError, "Couldn't load array from"): self.runProgram(PROGRAM)
+
+    def testIndexErrors(self):
+        for index, message in INDEX_ERRORS.items():
+            for name, run in (("interpreter", self.runProgram), ("py", self.runTranspiled)):
+                for line in ("WRITE d[k]", "d[k] <- 1"):
+                    with self.subTest(backend = name, index = index, line = line):
+                        with self.assertRaises(RuntimeError) as error: run(f"READ d[]\nk <- {index}\n{line}")
+                        self.assertEqual(str(error.exception), message)
+
+    def testNotAnArray(self):
+        with self.assertRaisesRegex(RuntimeError, "Variable \"x\" is not an array."): self.runProgram("x <- 1\nWRITE x[0]")
+
+    def testWholeArrayConditions(self): #Items compare like numbers, whole arrays can't give a single truth value
+        self.assertEqual(self.runProgram("READ d[]\nIF d[3] > d[0] THEN WRITE 1 ELSE WRITE 0"), ["1"])
+        for condition in ("d > 1", "d = d", "d < d[0]"):
+            with self.subTest(condition = condition):
+                with self.assertRaisesRegex(RuntimeError, "Cannot compare whole arrays"): self.runProgram(f"READ d[]\nIF {condition} THEN WRITE 1")
+                with self.assertRaisesRegex(RuntimeError, "Cannot compare whole arrays"): self.runProgram(f"READ d[]\nWHILE {condition} DO WRITE 1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#Binary ASTs: dumps loaded back into the same AST at any depth, refused when written by older format versions, corrupted or truncated, and never mistaken for sources
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astdump
+import interpreter
+from bench import generateNestedProgram
+from grammar import TableParser
+from interpreter import Interpreter
+from main import readPath
+
+DEPTHS = (100, 20000) #Written whole, and through the preorder walk way past Python's recursion limit
+PROGRAM = "\n".join([
+    "s <- 0",
+    "FOR i <- 0 TO 3 DO {",
+    "    IF s < 2.5 THEN s <- s + 1.5 ELSE {",
+    "        REPEAT s <- s - 1 UNTIL s < 1",
+    "    }",
+    "}",
+    "WRITE s",
+])
+
+def sameAST(first, second): #Compares the node types and the order of the keys too, without recursing
+    stack = [(first, second)]
+    while stack:
+        first, second = stack.pop()
+        if type(first) is not type(second): return False
+        if type(first) is dict:
+            if list(first) != list(second): return False
+            stack.extend((first[key], second[key]) for key in first)
+        elif type(first) is list:
+            if len(first) != len(second): return False
+            stack.extend(zip(first, second))
+        elif first != second: return False
+    return True
+
+def dumpBinary(program):
+    fd = io.BytesIO()
+    astdump.dumpBinary(program, fd)
+    return fd.getvalue()
+
+class ASTDumpTest(unittest.TestCase):
+    def setUp(self):
+        self.recursionLimit = sys.getrecursionlimit()
+        sys.setrecursionlimit(1000) #Every depth tested is well past it, so any recursion left in the dump or the load fails
+
+    def tearDown(self):
+        sys.setrecursionlimit(self.recursionLimit)
+
+    def runProgram(self, fileContent):
+        program = Interpreter(fileContent)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            program.build()
+            program.run()
+        return out.getvalue().splitlines()[1:-1], interpreter.runtime_vars
+
+    def checkRoundTrip(self, program):
+        data = dumpBinary(program)
+        self.assertTrue(astdump.isBinary(data))
+        self.assertTrue(sameAST(astdump.loadBinary(data), program))
+        return data
+
+    def testRoundTrip(self):
+        data = self.checkRoundTrip(TableParser(PROGRAM).parse())
+        self.assertEqual(self.runProgram(data), self.runProgram(PROGRAM))
+        for node in ({"type" : "Empty"}, {"type" : "Values", "value" : [[], [{"type" : "Empty"}], 1.5, None, "text", True]}):
+            self.checkRoundTrip(node)
+
+    def testDeepRoundTrip(self):
+        for depth in DEPTHS:
+            with self.subTest(depth = depth):
+                data = self.checkRoundTrip(TableParser(generateNestedProgram(depth)).parse())
+                out, variables = self.runProgram(data)
+                self.assertEqual(out, ["1"])
+                self.assertEqual(variables["x"], 1)
+
+    def testOldVersionsRefused(self):
+        data = dumpBinary(TableParser(PROGRAM).parse())
+        for magic in astdump.OLD_MAGICS:
+            with self.subTest(version = magic[-1]):
+                old = magic + data[len(astdump.MAGIC):]
+                self.assertTrue(astdump.isBinary(old))
+                with self.assertRaisesRegex(Exception, f"format version {magic[-1]}, this version only loads version {astdump.MAGIC[-1]}"): astdump.loadBinary(old)
+
+    def testBrokenDumpsRefused(self):
+        data = dumpBinary(TableParser(generateNestedProgram(DEPTHS[-1])).parse())
+        header = len(astdump.MAGIC) + astdump.CHUNK_SIZE.size
+        for name, broken, error in (
+            ("truncated", data[:len(data) // 2], "Truncated binary AST."),
+            ("corrupted", data[:header] + bytes(len(data) - header), "Corrupted binary AST."),
+            ("not binary", b"WRITE 1", "Not a binary AST"),
+        ):
+            with self.subTest(dump = name):
+                with self.assertRaisesRegex(Exception, error): astdump.loadBinary(broken)
+
+    def testSourcesNeverBinary(self): #Sources can be named after the magic, they still don't start with a NUL byte
+        source = "PCAST <- 1\nWRITE PCAST\n"
+        self.assertFalse(astdump.isBinary(source.encode()))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pcast.sudo")
+            with open(path, "w") as fd: fd.write(source)
+            self.assertEqual(readPath(path), source)
+        self.assertEqual(self.runProgram(source)[0], ["1"])
+
+if __name__ == "__main__":
+    unittest.main()
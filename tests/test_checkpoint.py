@@ -0,0 +1,130 @@
+#Checkpoints: a run interrupted right after any of its saves and resumed from it ends like the uninterrupted run, for every checkpointed exec
+import builtins
+import contextlib
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+from checkpoint import Checkpointer
+from interpreter import Interpreter
+
+PROGRAM = "\n".join([ #Loops with and without steps in their Blocks, IFs holding loops and a READ of two values
+    "READ n, m",
+    "s <- 0",
+    "FOR i <- 0 TO n DO {",
+    "    j <- 0",
+    "    WHILE j < m DO {",
+    "        j <- j + 1",
+    "        IF j > 1 THEN s <- s + j ELSE s <- s - 1",
+    "    }",
+    "    IF i > 1 THEN {",
+    "        k <- 0",
+    "        REPEAT {",
+    "            k <- k + 1",
+    "        } UNTIL k > 2",
+    "        FOR q <- 0 TO 2 DO {",
+    "            s <- s + q",
+    "        }",
+    "    }",
+    "    WRITE s",
+    "}",
+    "t <- 0",
+    "REPEAT {",
+    "    WHILE t < 3 DO t <- t + 1",
+    "    t <- t + 1",
+    "} UNTIL t > 8",
+    "WHILE t < 13 DO {",
+    "    FOR q <- 0 TO 2 DO t <- t + 1",
+    "}",
+    "READ z",
+    "WRITE s + z",
+])
+INPUTS = {"n" : "4", "m" : "3", "z" : "5"}
+INLINE_DEPTHS = (interpreter.INLINE_DEPTH, 0) #The default one runs the plain and inner execs, with 0 every Block is compound and runs the nested ones
+
+class Interrupted(Exception): pass
+
+class InterruptingCheckpointer(Checkpointer): #Stops the run right after its saveLimit-th save, like a killed process would
+    saveLimit = 1
+    saves = 0
+
+    def save(self, variables, position):
+        super().save(variables, position)
+        self.saves += 1
+        if self.saves == self.saveLimit: raise Interrupted()
+
+def execNames(node): #Names of the execs every node of the built tree runs with
+    names = {f"{type(node).__name__}.{node.exec.__name__}"}
+    for child in (*node.__dict__.get("lines", ()), *(node.__dict__[field] for field in ("block", "elseBlock") if field in node.__dict__)):
+        names |= execNames(child)
+    return names
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, "program.ck")
+        self.input, builtins.input = builtins.input, lambda prompt = "": INPUTS[prompt.split('"')[1]]
+        self.inlineDepth = interpreter.INLINE_DEPTH
+
+    def tearDown(self):
+        builtins.input = self.input
+        interpreter.INLINE_DEPTH = self.inlineDepth
+        self.directory.cleanup()
+
+    def runProgram(self, checkpointer = None, resume_from = None):
+        program = Interpreter(PROGRAM, checkpointer = checkpointer)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            program.build()
+            try: program.run(resume_from = resume_from)
+            except Interrupted: pass
+        lines = [line for line in out.getvalue().splitlines() if line not in ("Build complete.", "Execution terminated successfully.")]
+        return lines, dict(interpreter.runtime_vars), program
+
+    def testEveryExecVariant(self):
+        names = set()
+        for inlineDepth in INLINE_DEPTHS:
+            interpreter.INLINE_DEPTH = inlineDepth
+            names |= execNames(self.runProgram(Checkpointer(self.fileName, everySteps = 1000))[2].AST)
+        variants = {function.__qualname__ for function in interpreter.CHECKPOINTED_LOCALS}
+        self.assertEqual(variants - names, set())
+
+    def testResumeAfterEverySave(self):
+        for inlineDepth in INLINE_DEPTHS:
+            interpreter.INLINE_DEPTH = inlineDepth
+            expected, variables, _ = self.runProgram()
+            saveLimit = 1
+            while True:
+                with self.subTest(inlineDepth = inlineDepth, saveLimit = saveLimit):
+                    checkpointer = InterruptingCheckpointer(self.fileName, everySteps = 1)
+                    checkpointer.saveLimit = saveLimit
+                    before, _, _ = self.runProgram(checkpointer)
+                    if checkpointer.saves < saveLimit: break #Ran to the end, every save point was tried
+                    after, resumedVariables, _ = self.runProgram(Checkpointer(self.fileName, everySteps = 1000), resume_from = self.fileName)
+                    self.assertEqual(before + after, expected)
+                    self.assertEqual(resumedVariables, variables)
+                saveLimit += 1
+            self.assertGreater(saveLimit, 30)
+
+    def testDifferentProgramRefused(self):
+        self.runProgram(InterruptingCheckpointer(self.fileName, everySteps = 1))
+        other = Interpreter("WRITE 1", checkpointer = Checkpointer(self.fileName, everySteps = 1))
+        with contextlib.redirect_stdout(io.StringIO()):
+            other.build()
+            with self.assertRaisesRegex(Exception, "different program"): other.run(resume_from = self.fileName)
+
+    def testSavedFileMode(self):
+        mask = os.umask(0o022)
+        try: Checkpointer(self.fileName, everySteps = 1).save({"x" : 1}, [])
+        finally: os.umask(mask)
+        self.assertEqual(stat.S_IMODE(os.stat(self.fileName).st_mode), 0o644)
+        with open(self.fileName) as fd: self.assertEqual(json.load(fd)["variables"], {"x" : 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+#Common-subexpression elimination: values are reused only while none of their operands may have changed, across Blocks that may not run, loops running again and array items
+import builtins
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+from cse import eliminate
+from grammar import TableParser
+from interpreter import Interpreter
+
+PROGRAMS = { #Source -> texts of the Values reused, by how many evaluations
+    "IF reuses what ran before it" : ({"y <- a + b" : 2}, [
+        "a <- 2",
+        "b <- 3",
+        "y <- a + b",
+        "IF y > 0 THEN z <- a + b ELSE z <- b + a",
+        "WRITE z",
+    ]),
+    "IF and ELSE Blocks forget their values" : ({}, [
+        "READ c",
+        "a <- 2",
+        "b <- 3",
+        "IF c > 0 THEN y <- a + b ELSE {",
+        "    a <- 5",
+        "    z <- a + b",
+        "}",
+        "w <- a + b",
+        "WRITE w",
+    ]),
+    "WHILE runs its Block after it changed the operands" : ({"y <- a + b" : 1}, [
+        "a <- 1",
+        "b <- 2",
+        "x <- a + b",
+        "i <- 0",
+        "WHILE i < 3 DO {",
+        "    y <- a + b",
+        "    z <- a + b",
+        "    a <- a + 1",
+        "    i <- i + 1",
+        "}",
+        "WRITE y + z",
+    ]),
+    "FOR runs its Block after it changed the operands" : ({}, [
+        "a <- 1",
+        "b <- 2",
+        "x <- a * b",
+        "FOR i <- 0 TO 3 DO {",
+        "    y <- a * b",
+        "    b <- y + 1",
+        "}",
+        "WRITE b + x",
+    ]),
+    "UNTIL reads the values of the REPEAT Block" : ({"t <- k * 2" : 1}, [
+        "k <- 0",
+        "REPEAT {",
+        "    k <- k + 1",
+        "    t <- k * 2",
+        "} UNTIL k * 2 > 6",
+        "WRITE t",
+    ]),
+    "UNTIL doesn't compute values for the lines after it" : ({}, [
+        "k <- 0",
+        "REPEAT {",
+        "    k <- k + 1",
+        "} UNTIL k * 2 > 6",
+        "t <- k * 2",
+        "WRITE t",
+    ]),
+    "Self-assignments change their own operand" : ({}, [
+        "x <- 1",
+        "x <- x + 1",
+        "y <- x + 1",
+        "WRITE y",
+    ]),
+    "Assigning a variable changes it" : ({"z <- x + 1" : 1}, [
+        "x <- 1",
+        "y <- x + 1",
+        "x <- y",
+        "z <- x + 1",
+        "w <- x + 1",
+        "WRITE z + w",
+    ]),
+}
+ARRAY_PROGRAMS = {
+    "Array items are reused" : ({"x <- d[1] + 1" : 1}, [
+        "READ d[]",
+        "x <- d[1] + 1",
+        "y <- d[1] + 1",
+        "WRITE x + y",
+    ]),
+    "Item assignments change the items" : ({}, [
+        "READ d[]",
+        "x <- d[1] + 1",
+        "d[1] <- 5",
+        "y <- d[1] + 1",
+        "WRITE x + y",
+    ]),
+    "Item assignments change the items of aliased arrays" : ({}, [
+        "READ d[]",
+        "e <- d",
+        "x <- d[1] + 1",
+        "e[1] <- 5",
+        "y <- d[1] + 1",
+        "WRITE x + y",
+    ]),
+}
+CONDITIONS = ("1", "0") #Values READ into c, so that both the THEN and the ELSE Blocks run
+
+def reusedValues(source):
+    _, reused = eliminate(TableParser(source).parse())
+    return {value.text() : value.reuses for value in reused}
+
+class CSETest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        arrayFile = os.path.join(self.directory.name, "d.txt")
+        with open(arrayFile, "w") as fd: fd.write("1 2 3")
+        self.inputs = {"c" : "1", "d" : arrayFile}
+        self.input, builtins.input = builtins.input, lambda prompt = "": self.inputs[prompt.split('"')[1]]
+
+    def tearDown(self):
+        builtins.input = self.input
+        self.directory.cleanup()
+
+    def runProgram(self, source, **toggles): #Output and variables, leaving out the temporaries of the rewritten program
+        program = Interpreter(source, **toggles)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            program.build()
+            program.run()
+        return out.getvalue().splitlines(), {name : value for name, value in interpreter.runtime_vars.items() if not name.startswith("_")}
+
+    def checkPrograms(self, programs):
+        for name, (expected, lines) in programs.items():
+            source = "\n".join(lines)
+            with self.subTest(program = name):
+                self.assertEqual(reusedValues(source), expected)
+                for condition in CONDITIONS:
+                    self.inputs["c"] = condition
+                    plain, rewritten = self.runProgram(source), self.runProgram(source, toggle_cse = True)
+                    self.assertEqual(rewritten[0], plain[0])
+                    self.assertEqual(rewritten[1].keys(), plain[1].keys())
+                    for variable, result in plain[1].items(): self.assertEqual(str(rewritten[1][variable]), str(result))
+
+    def testInvalidation(self):
+        self.checkPrograms(PROGRAMS)
+
+    def testArrayItems(self):
+        try: import numpy
+        except ImportError: self.skipTest("Array variables need NumPy.")
+        self.checkPrograms(ARRAY_PROGRAMS)
+
+    def testTemporariesDontClash(self): #Programs rewritten already, like binary ASTs dumped with --cse, hold temporaries of their own
+        source = "\n".join(["a <- 1", "b <- 2", "WRITE a + b", "WRITE a + b"])
+        once, _ = eliminate(TableParser(source).parse())
+        twice, reused = eliminate(once)
+        self.assertEqual([value.text() for value in reused], [])
+        self.assertEqual([line.get("target") for line in twice["value"]], ["a", "b", "_t0", None, None])
+
+if __name__ == "__main__":
+    unittest.main()
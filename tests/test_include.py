@@ -0,0 +1,83 @@
+#INCLUDE: modules resolved next to the file INCLUDing them, circular INCLUDEs refused and cached module lines never changed by the lines after them, with both parsers
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+import parser
+from interpreter import Interpreter
+
+MODULES = { #Path of every module file, from the directory of the main program -> its lines
+    "helper.sudo" : ["y <- 99"],
+    "FILES/helper.sudo" : ["y <- 10"],
+    "FILES/counter.sudo" : ["INCLUDE helper", "y <- y + 1"],
+    "FILES/nested.sudo" : ["INCLUDE deep", "y <- y * 2"],
+    "FILES/FILES/deep.sudo" : ["y <- 3"],
+    "FILES/condition.sudo" : ["x <- 0", "IF 1 < 2 THEN x <- 1"],
+    "FILES/self.sudo" : ["INCLUDE self"],
+    "FILES/first.sudo" : ["INCLUDE second"],
+    "FILES/second.sudo" : ["INCLUDE third"],
+    "FILES/third.sudo" : ["INCLUDE first"],
+}
+PARSERS = {"TableParser" : True, "Parser" : False}
+
+class IncludeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for path, lines in MODULES.items():
+            path = os.path.join(self.directory.name, path)
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            with open(path, "w") as fd: fd.write("\n".join(lines) + "\n")
+        parser.moduleCache.clear() #Modules of other tests may share the content of these ones
+
+    def tearDown(self):
+        parser.moduleCache.clear()
+        self.directory.cleanup()
+
+    def runProgram(self, lines, tableParser):
+        program = Interpreter("\n".join(lines), toggle_tableParser = tableParser, directory = self.directory.name)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            program.build()
+            program.run()
+        return out.getvalue().splitlines()[1:-1], interpreter.runtime_vars
+
+    def checkPrograms(self, programs): #Every program runs twice with each parser, the second time from the module cache
+        for name, tableParser in PARSERS.items():
+            for _ in range(2):
+                for lines, expected in programs:
+                    with self.subTest(parser = name, program = lines):
+                        self.assertEqual(self.runProgram(lines, tableParser)[0], expected)
+
+    def testModuleDirectories(self): #The helper next to counter is INCLUDEd, not the one next to the main program
+        self.checkPrograms([
+            (["INCLUDE helper", "WRITE y"], ["99"]),
+            (["INCLUDE counter", "WRITE y"], ["11"]),
+            (["INCLUDE nested", "WRITE y"], ["6"]),
+            (["IF 1 < 2 THEN INCLUDE counter", "INCLUDE counter", "WRITE y"], ["11"]),
+        ])
+
+    def testCircularIncludes(self):
+        for name, tableParser in PARSERS.items():
+            for module, cycle in (("self", "self -> self"), ("first", "first -> second -> third -> first")):
+                with self.subTest(parser = name, module = module):
+                    with self.assertRaisesRegex(Exception, f"Circular INCLUDE detected: <main> -> {cycle}$"): self.runProgram([f"INCLUDE {module}"], tableParser)
+
+    def testMissingModule(self):
+        for name, tableParser in PARSERS.items():
+            with self.subTest(parser = name):
+                with self.assertRaisesRegex(Exception, "Couldn't INCLUDE module \"missing\""): self.runProgram(["INCLUDE missing"], tableParser)
+
+    def testElseAfterInclude(self): #The IF ending the module is shared by every program INCLUDing it, an ELSE right after the INCLUDE can't be glued to it
+        for name, tableParser in PARSERS.items():
+            with self.subTest(parser = name):
+                with self.assertRaisesRegex(Exception, "Unexpected \"ELSE\""): self.runProgram(["INCLUDE condition", "ELSE x <- 2"], tableParser)
+                self.assertEqual(self.runProgram(["INCLUDE condition", "WRITE x"], tableParser)[0], ["1"])
+                for program, _ in parser.moduleCache.values(): self.assertNotIn("else", program["value"][-1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+#Lazy builds: Blocks built while the program runs, whatever other Interpreters did in between, and the execs they settle on once built
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+from bench import LAZY_LOOPS
+from interpreter import Interpreter
+
+NESTED_IF = "\n".join([
+    "x <- 0",
+    "IF 1 < 2 THEN {",
+    "    IF 2 < 3 THEN {",
+    "        x <- 3",
+    "    }",
+    "}",
+    "WRITE x",
+])
+
+def execs(node, depth = 0): #The exec every built node runs with, indented by nesting
+    found = [f"{'  ' * depth}{type(node).__name__} {node.exec.__name__} {node.isCompound}"]
+    for child in (*node.__dict__.get("lines", ()), *(node.__dict__[field] for field in ("block", "elseBlock") if field in node.__dict__)):
+        found += execs(child, depth + 1)
+    return found
+
+class LazyTest(unittest.TestCase):
+    def build(self, source, **toggles):
+        program = Interpreter(source, **toggles)
+        with contextlib.redirect_stdout(io.StringIO()): program.build()
+        return program
+
+    def runProgram(self, program):
+        with contextlib.redirect_stdout(io.StringIO()) as out: program.run()
+        return out.getvalue().splitlines()
+
+    def testOtherInterpreterBuiltInBetween(self):
+        program = self.build(NESTED_IF, toggle_lazyBuild = True)
+        self.build("WRITE 5")
+        self.assertEqual(self.runProgram(program)[0], "3")
+
+    def testTranspileAfterOtherInterpreter(self):
+        program = self.build(NESTED_IF, toggle_lazyBuild = True)
+        self.build("WRITE 5")
+        self.assertIn("x = 3", program.transpileText("py"))
+
+    def testSettlesLikeEagerBuilds(self): #Every node holding a built Block leaves the nested path, not only the loop or IF right above it
+        for name, lines in LAZY_LOOPS.items():
+            with self.subTest(program = name):
+                source = "\n".join(lines).format(repeats = 100, outer = 10)
+                eager, lazy = self.build(source), self.build(source, toggle_lazyBuild = True)
+                self.runProgram(eager)
+                self.assertEqual(self.runProgram(lazy), ["Execution terminated successfully."])
+                self.assertEqual(execs(lazy.AST), execs(eager.AST))
+                self.assertEqual(interpreter.runtime_vars["x"], 10 if name.startswith("FOR") else 100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#Metrics: the JSON written by the --metrics of run and transpile, with and without memory tracing
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import readArguments, runCommand
+
+PROGRAM = "\n".join([
+    "s <- 0",
+    "FOR i <- 0 TO 3 DO s <- s + 1",
+    "WRITE s",
+])
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "program.sudo")
+        self.metricsFile = os.path.join(self.directory.name, "metrics.json")
+        with open(self.path, "w") as fd: fd.write(PROGRAM)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def runCommand(self, *argv):
+        with contextlib.redirect_stdout(io.StringIO()): self.assertEqual(runCommand(readArguments([*argv, "--metrics", self.metricsFile])), 0)
+        with open(self.metricsFile) as fd: return json.load(fd)
+
+    def testPeakMemory(self): #Phases only hold a peak when memory is traced, the whole run holds null instead
+        for options in ((), ("--stream",)):
+            with self.subTest(options = options):
+                metrics = self.runCommand("run", self.path, *options)
+                self.assertIsNone(metrics["peakMemory"])
+                self.assertFalse(any("peakMemory" in phase for phase in metrics["phases"].values()))
+        metrics = self.runCommand("run", self.path, "--metrics-memory")
+        self.assertGreater(metrics["peakMemory"], 0)
+        self.assertEqual(metrics["peakMemory"], max(phase["peakMemory"] for phase in metrics["phases"].values() if "peakMemory" in phase))
+
+    def testTranspile(self):
+        metrics = self.runCommand("transpile", self.path, "--lang", "py,js", "--out-dir", self.directory.name)
+        self.assertEqual(metrics["phases"]["transpile"]["calls"], 2)
+        self.assertIn("build", metrics["phases"])
+        self.assertGreater(metrics["counters"]["nodes"], 0)
+        self.assertIsNone(metrics["peakMemory"])
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "program.py")))
+        metrics = self.runCommand("transpile", self.path, "--lang", "c", "--out-dir", self.directory.name, "--metrics-memory")
+        self.assertIn("peakMemory", metrics["phases"]["transpile"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#Deeply nested programs through the explicit stack pipeline: TableParser, buildTree and runTree, at depths far past Python's recursion limit
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+from bench import generateNestedProgram
+from checkpoint import Checkpointer
+from grammar import TableParser
+
+DEPTHS = (10000, 25000)
+
+def nestingDepth(program): #Counts the Blocks nested in the dict AST without recursing
+    deepest, stack = 0, [(program, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if type(node) is list: stack.extend((child, depth) for child in node)
+        elif type(node) is dict:
+            if node.get("type") in ("Program", "Block"): depth += 1
+            deepest = max(deepest, depth)
+            stack.extend((child, depth) for child in node.values())
+    return deepest
+
+class Interrupted(Exception): pass
+
+class InterruptingCheckpointer(Checkpointer): #Stops the run right after its first save, like a killed process would
+    def save(self, variables, position):
+        super().save(variables, position)
+        raise Interrupted()
+
+class NestingTest(unittest.TestCase):
+    def setUp(self):
+        self.recursionLimit = sys.getrecursionlimit()
+        sys.setrecursionlimit(1000) #Every depth tested is well past it, so any recursion left in the pipeline fails
+
+    def tearDown(self):
+        sys.setrecursionlimit(self.recursionLimit)
+
+    def runProgram(self, source, resume_from = None, **toggles):
+        program = interpreter.Interpreter(source, **toggles)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            program.build()
+            program.run(resume_from = resume_from)
+        return out.getvalue().splitlines(), interpreter.runtime_vars
+
+    def testParse(self):
+        for depth in DEPTHS:
+            with self.subTest(depth = depth):
+                self.assertGreaterEqual(nestingDepth(TableParser(generateNestedProgram(depth)).parse()), depth + 1)
+
+    def testBuildAndRun(self):
+        for depth in DEPTHS:
+            for toggles in ({}, {"toggle_lazyBuild" : True}, {"toggle_metrics" : True}):
+                with self.subTest(depth = depth, **toggles):
+                    out, variables = self.runProgram(generateNestedProgram(depth), **toggles)
+                    self.assertEqual(out[-2:], ["1", "Execution terminated successfully."])
+                    self.assertEqual(variables["x"], 1)
+
+    def testCheckpointResume(self): #Every third level is a FOR, whose first iteration is one step, so the save lands most of the way down
+        depth = DEPTHS[0]
+        source = generateNestedProgram(depth)
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "nested.ck")
+            with self.assertRaises(Interrupted): self.runProgram(source, checkpointer = InterruptingCheckpointer(fileName, everySteps = depth // 4))
+            with open(fileName) as fd: self.assertGreater(len(json.load(fd)["position"]), depth // 2)
+            out, variables = self.runProgram(source, resume_from = fileName, checkpointer = Checkpointer(fileName, everySteps = 1000))
+        self.assertEqual(out[-2:], ["1", "Execution terminated successfully."])
+        self.assertEqual(variables["x"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#REPEAT/UNTIL: the UNTIL of a REPEAT goes on its line or on the next one, a REPEAT left without one is a parse error for every parser
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+from interpreter import Interpreter, StreamInterpreter
+
+COMPLETE = [
+    ["k <- 0", "REPEAT k <- k + 1 UNTIL k > 2", "WRITE k"],
+    ["k <- 0", "REPEAT {", "    k <- k + 1", "} UNTIL k > 2", "WRITE k"],
+    ["k <- 0", "REPEAT {", "    k <- k + 1", "}", "", "UNTIL k > 2", "WRITE k"],
+    ["k <- 0", "IF 1 < 2 THEN {", "    REPEAT k <- k + 1", "    UNTIL k > 2", "}", "WRITE k"],
+]
+WITHOUT_UNTIL = [
+    ["k <- 0", "REPEAT k <- k + 1", "WRITE k"],
+    ["k <- 0", "REPEAT k <- k + 1"],
+    ["k <- 0", "REPEAT {", "    k <- k + 1", "}"],
+    ["k <- 0", "IF 1 < 2 THEN REPEAT k <- k + 1", "WRITE k"],
+    ["k <- 0", "IF 1 < 2 THEN {", "    REPEAT k <- k + 1", "}", "WRITE k"],
+    ["k <- 0", "REPEAT REPEAT k <- k + 1 UNTIL k > 1", "WRITE k"],
+    ["k <- 0", "WHILE k < 2 DO REPEAT k <- k + 1", "UNTIL k > 2"],
+]
+
+class RepeatTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def runners(self, lines): #The table-driven Parser, the recursive one and the stream one
+        source = "\n".join(lines) + "\n"
+        fileName = os.path.join(self.directory.name, "program.sudo")
+        with open(fileName, "w") as fd: fd.write(source)
+        yield "TableParser", lambda: Interpreter(source).exec()
+        yield "Parser", lambda: Interpreter(source, toggle_tableParser = False).exec()
+        yield "StreamParser", lambda: StreamInterpreter(fileName).exec()
+
+    def testComplete(self):
+        for lines in COMPLETE:
+            for name, run in self.runners(lines):
+                with self.subTest(parser = name, program = lines):
+                    with contextlib.redirect_stdout(io.StringIO()) as out: run()
+                    self.assertIn("3", out.getvalue().splitlines())
+                    self.assertEqual(interpreter.runtime_vars["k"], 3)
+
+    def testWithoutUntil(self):
+        for lines in WITHOUT_UNTIL:
+            for name, run in self.runners(lines):
+                with self.subTest(parser = name, program = lines):
+                    with contextlib.redirect_stdout(io.StringIO()), self.assertRaisesRegex(Exception, "^REPEAT without UNTIL$"): run()
+
+if __name__ == "__main__":
+    unittest.main()
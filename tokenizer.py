@@ -5,14 +5,16 @@ tokenPatterns = [
     ["^#[^\n$]*", None],
     ["^\n+", "newline"],
     ["^<-", "arrow"],
-    ["^\{\n*", "openBlock"],
-    ["^\}", "closeBlock"],
+    [r"^\{\n*", "openBlock"],
+    [r"^\}", "closeBlock"],
     ["^,", ","],
+    [r"^\[", "["],
+    [r"^\]", "]"],
     ["^(<=|<|>=|>|=|!=)", "comparison"],
     ["^\"[^\"\n]*\"", "message"],
-    ["^-?\d+(\.\d+)?", "NUMBER"],
-    ["^([\+\-\*\/\^]|MOD|TO)", "operand"],
-    ["^(WRITE|READ|IF|FOR|WHILE|REPEAT|THEN|DO|ELSE|UNTIL)", "KEYWORD"],
+    [r"^-?\d+(\.\d+)?", "NUMBER"],
+    [r"^([\+\-\*\/\^]|MOD|TO)", "operand"],
+    ["^(WRITE|READ|IF|FOR|WHILE|REPEAT|THEN|DO|ELSE|UNTIL|INCLUDE)", "KEYWORD"],
     ["^[a-zA-Z][a-zA-Z0-9]*", "WORD"],
     ["^[^ \n$]*( |\n|$)", "unknown"],
 ]